@@ -0,0 +1,8 @@
+"""
+Нагрузочные замеры проекта YaNews.
+
+Запускаются из папки ya_news, например:
+python -m benchmarks.search --rows 1000000
+Каждый замер работает на отдельной временной базе SQLite
+и не трогает db.sqlite3 проекта.
+"""
@@ -0,0 +1,121 @@
+"""Пропускная способность и p99 главной и страницы новости: WSGI и ASGI."""
+import asyncio
+import io
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.utils import make_parser, setup_django
+
+PATHS = ('/', '/news/1/')
+
+
+def fill(rows):
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+    if News.objects.exists():
+        return
+    author = get_user_model().objects.create(username='bench')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Просто текст. ' * 20)
+        for index in range(rows)
+    )
+    news = News.objects.order_by('id').first()
+    for index in range(30):
+        Comment.objects.create(news=news, author=author, text=f'К {index}')
+
+
+def summary(name, latencies, elapsed):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f'{name:<28} {len(latencies) / elapsed:8.1f} rps  '
+        f'median={statistics.median(latencies) * 1000:7.2f} ms  '
+        f'p99={p99:7.2f} ms'
+    )
+
+
+def bench_wsgi(requests, concurrency):
+    from yanews.wsgi import application
+
+    def call(path):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+            'HTTP_HOST': 'localhost', 'wsgi.input': io.BytesIO(),
+            'wsgi.errors': sys.stderr, 'wsgi.url_scheme': 'http',
+        }
+        start = time.perf_counter()
+        body = application(environ, lambda status, headers: None)
+        b''.join(body)
+        body.close()
+        return time.perf_counter() - start
+
+    paths = [PATHS[index % len(PATHS)] for index in range(requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        latencies = list(executor.map(call, paths))
+    summary(f'WSGI, {concurrency} потоков', latencies,
+            time.perf_counter() - start)
+
+
+def bench_asgi(application, name, requests, concurrency):
+    async def call(path, semaphore):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'path': path, 'raw_path': path.encode(),
+            'query_string': b'', 'root_path': '', 'scheme': 'http',
+            'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80), 'client': ('127.0.0.1', 1),
+        }
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            pass
+
+        async with semaphore:
+            start = time.perf_counter()
+            await application(scope, receive, send)
+            return time.perf_counter() - start
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(
+            call(PATHS[index % len(PATHS)], semaphore)
+            for index in range(requests)
+        ))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(run())
+    summary(f'{name}, {concurrency} задач', latencies,
+            time.perf_counter() - start)
+
+
+def main():
+    parser = make_parser(__doc__, 100)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--workers', type=int, help='NEWS_ASYNC_WORKERS.')
+    args = parser.parse_args()
+    setup_django(args.db)
+    fill(args.rows)
+    from django.conf import settings
+    if args.workers:
+        settings.NEWS_ASYNC_WORKERS = args.workers
+    from django.core.handlers.asgi import ASGIHandler
+
+    from yanews.asgi import application
+    settings.ALLOWED_HOSTS = ['localhost']
+    bench_wsgi(args.requests, args.concurrency)
+    bench_asgi(ASGIHandler(), 'ASGI, sync-представления',
+               args.requests, args.concurrency)
+    bench_asgi(application, 'ASGI, async-представления',
+               args.requests, args.concurrency)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Проверка комментария на запрещённые слова: цикл по словам и автомат."""
+import random
+
+from benchmarks.utils import make_parser, make_vocabulary, measure, report
+
+
+def loop_filter(words, text):
+    """Прежняя реализация CommentForm.clean_text."""
+    lowered_text = text.lower()
+    return [word for word in words if word in lowered_text]
+
+
+def main():
+    parser = make_parser(__doc__, 0)
+    parser.parse_args()
+    from news.profanity import WordFilter
+
+    vocabulary = make_vocabulary(30_000)
+    rnd = random.Random(3)
+    for dictionary_size in (10, 1_000, 10_000):
+        words = rnd.sample(vocabulary, dictionary_size)
+        word_filter = WordFilter(words)
+        for text_words in (50, 5_000):
+            # Чистый текст: худший случай, просматривается целиком.
+            text = ' '.join(
+                word[::-1] for word in rnd.choices(vocabulary, k=text_words)
+            )
+            name = f'{dictionary_size} слов, {len(text)} симв.'
+            report(f'цикл, {name}', measure(
+                lambda: loop_filter(words, text), repeat=5
+            ))
+            report(f'автомат, {name}', measure(
+                lambda: word_filter.find_all(text), repeat=5
+            ))
+
+
+if __name__ == '__main__':
+    main()
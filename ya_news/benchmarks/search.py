@@ -0,0 +1,65 @@
+"""Полнотекстовый поиск FTS5 против сканирования LIKE."""
+import random
+import time
+
+from benchmarks.utils import (
+    make_parser, make_text, make_vocabulary, measure, report, setup_django
+)
+
+
+def fill(rows, vocabulary):
+    from django.db import connection, transaction
+
+    from news.models import News
+    if News.objects.count() >= rows:
+        return
+    rnd = random.Random(1)
+    start = time.perf_counter()
+    batch = 10_000
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(0, rows, batch):
+            cursor.executemany(
+                'INSERT INTO news_news (title, text, date, comment_count) '
+                'VALUES (%s, %s, %s, 0)',
+                [
+                    (
+                        make_text(rnd, vocabulary, 4)[:50],
+                        make_text(rnd, vocabulary, 60),
+                        '2022-01-01',
+                    )
+                    for _ in range(min(batch, rows - offset))
+                ],
+            )
+    print(f'Заполнено {rows} новостей за {time.perf_counter() - start:.1f} с')
+
+
+def main():
+    args = make_parser(__doc__, 1_000_000).parse_args()
+    setup_django(args.db)
+    from django.conf import settings
+
+    from news.models import News
+    from news.search import search_news
+
+    vocabulary = make_vocabulary(20_000)
+    fill(args.rows, vocabulary)
+    limit = settings.NEWS_SEARCH_RESULTS
+    rnd = random.Random(2)
+    for term in rnd.sample(vocabulary, 3):
+        report(f'FTS5 «{term}»', measure(
+            lambda: search_news(term, limit), repeat=10
+        ))
+        report(f'LIKE «{term}»', measure(
+            lambda: list(News.objects.filter(text__icontains=term)[:limit]),
+            repeat=3,
+        ))
+        report(f'LIKE, нет совпадений «{term}я»', measure(
+            lambda: list(
+                News.objects.filter(text__icontains=f'{term}я')[:limit]
+            ),
+            repeat=3,
+        ))
+
+
+if __name__ == '__main__':
+    main()
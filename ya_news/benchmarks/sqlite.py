@@ -0,0 +1,105 @@
+"""Конкурентные чтения и записи: SQLite по умолчанию и с PRAGMA."""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks.utils import make_parser, setup_django
+
+PROFILES = ('default', 'tuned')
+
+
+def fill(rows):
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+    if News.objects.exists():
+        return
+    author = get_user_model().objects.create(username='bench')
+    News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Просто текст. ' * 20)
+        for index in range(rows)
+    )
+    news = News.objects.order_by('id').first()
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'К {index}')
+        for index in range(30)
+    )
+
+
+def worker(write, deadline, counters):
+    from django.contrib.auth import get_user_model
+    from django.db import OperationalError, connection
+
+    from news.models import Comment, News
+    author = get_user_model().objects.get(username='bench')
+    news = News.objects.order_by('id').first()
+    done = errors = 0
+    while time.perf_counter() < deadline:
+        try:
+            if write:
+                Comment.objects.create(news=news, author=author, text='К')
+            else:
+                News.objects.get(pk=news.pk)
+                list(news.comment_set.order_by('created')[:50])
+            done += 1
+        except OperationalError:
+            errors += 1
+    connection.close()
+    counters.append((write, done, errors))
+
+
+def run(profile, args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
+    from django.conf import settings
+    if profile == 'default':
+        settings.DATABASES['default'].update(
+            ENGINE='django.db.backends.sqlite3', CONN_MAX_AGE=0, OPTIONS={},
+        )
+    setup_django(args.db)
+    fill(args.rows)
+    counters = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [
+        threading.Thread(
+            target=worker, args=(index < args.writers, deadline, counters)
+        )
+        for index in range(args.writers + args.readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for write, name in ((False, 'reads'), (True, 'writes')):
+        done = sum(item[1] for item in counters if item[0] == write)
+        errors = sum(item[2] for item in counters if item[0] == write)
+        print(
+            f'{profile:<8} {name:<7} {done / args.seconds:9.1f} ops/s  '
+            f'locked={errors}'
+        )
+
+
+def main():
+    parser = make_parser(__doc__, rows=100)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--profile', choices=PROFILES)
+    args = parser.parse_args()
+    if args.profile:
+        run(args.profile, args)
+        return
+    # Каждый профиль — в своём процессе и на своей базе: настройки
+    # соединения и режим журнала не должны переходить между прогонами.
+    for profile in PROFILES:
+        subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sqlite', '--profile', profile,
+             '--rows', str(args.rows), '--seconds', str(args.seconds),
+             '--readers', str(args.readers), '--writers', str(args.writers)],
+            check=True,
+        )
+
+
+if __name__ == '__main__':
+    main()
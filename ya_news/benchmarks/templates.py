@@ -0,0 +1,95 @@
+"""Рендеринг шаблонов и объём страниц: настройки разработки и продакшена."""
+import gzip
+from pathlib import Path
+
+from benchmarks.utils import make_parser, measure, report, setup_django
+
+
+def template_profiles():
+    from django.conf import settings
+    base = settings.TEMPLATES[0]
+    dev = {**base, 'OPTIONS': {**base['OPTIONS'], 'debug': True}}
+    return {'разработка': [dev], 'продакшен': [{
+        **base,
+        'APP_DIRS': False,
+        'OPTIONS': {**base['OPTIONS'], 'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )]},
+    }]}
+
+
+def fill():
+    from django.contrib.auth import get_user_model
+
+    from news.models import Comment, News
+    author, _ = get_user_model().objects.get_or_create(username='bench')
+    if not News.objects.exists():
+        News.objects.bulk_create(
+            News(title=f'Новость {index}', text='Просто текст. ' * 20)
+            for index in range(20)
+        )
+        news = News.objects.order_by('id').first()
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text=f'Комментарий {index}')
+            for index in range(50)
+        )
+    return author, News.objects.order_by('id').first()
+
+
+def stylesheet_bytes():
+    """Размер своего Bootstrap без сжатия и в gzip, если он скачан."""
+    from django.conf import settings
+
+    from news.templatetags.assets import BOOTSTRAP_STATIC_PATH
+    path = Path(settings.STATICFILES_DIRS[0]) / BOOTSTRAP_STATIC_PATH
+    if not path.exists():
+        return None
+    data = path.read_bytes()
+    return len(data), len(gzip.compress(data, compresslevel=9))
+
+
+def main():
+    parser = make_parser(__doc__, rows=20)
+    args = parser.parse_args()
+    setup_django(args.db)
+    from django.template.loader import get_template
+    from django.test import RequestFactory, override_settings
+
+    from news.views import NewsDetail, NewsList
+    author, news = fill()
+    factory = RequestFactory()
+    pages = {
+        'news/home.html': (NewsList, {}),
+        'news/detail.html': (NewsDetail, {'pk': news.pk}),
+    }
+    for profile, templates in template_profiles().items():
+        with override_settings(TEMPLATES=templates):
+            for name, (view, kwargs) in pages.items():
+                request = factory.get('/')
+                request.user = author
+                context = view.as_view()(request, **kwargs).context_data
+
+                def render():
+                    return get_template(name).render(context, request)
+
+                stats = measure(render, repeat=200)
+                html = render().encode()
+                stats['html_bytes'] = len(html)
+                stats['html_gzip_bytes'] = len(gzip.compress(html))
+                report(f'{profile}: {name}', stats)
+    css = stylesheet_bytes()
+    if css is None:
+        print('Bootstrap не скачан (vendor_static): стили идут с CDN.')
+    else:
+        print(
+            f'Bootstrap: {css[0]} байт, в gzip {css[1]} байт при первом '
+            f'визите; при повторных 0 — файл с хешем кешируется на год.'
+        )
+
+
+if __name__ == '__main__':
+    main()
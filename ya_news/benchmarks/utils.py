@@ -0,0 +1,76 @@
+import argparse
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+SYLLABLES = (
+    'ба', 'ве', 'го', 'ду', 'же', 'зо', 'ки', 'ла', 'ми', 'но', 'пе',
+    'ро', 'си', 'ту', 'фа', 'хо', 'це', 'ча', 'шу', 'ял', 'ст', 'ра',
+)
+
+
+def make_parser(description, rows):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--rows', type=int, default=rows, help='Размер набора данных.'
+    )
+    parser.add_argument(
+        '--db', help='Файл базы; заполненная база используется повторно.'
+    )
+    return parser
+
+
+def setup_django(db_path=None, settings_module='yanews.settings'):
+    """Настраивает Django на отдельную базу и применяет миграции."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    from django.conf import settings
+    if db_path is None:
+        db_path = Path(tempfile.mkdtemp()) / 'bench.sqlite3'
+    settings.DATABASES['default']['NAME'] = Path(db_path)
+    # Копии у временной базы нет: чтения идут в основную базу.
+    settings.DATABASES['replica']['NAME'] = Path(db_path).with_suffix(
+        '.replica.sqlite3'
+    )
+    settings.CACHES['sessions']['LOCATION'] = Path(db_path).parent / 'sessions'
+    settings.DEBUG = False
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def make_vocabulary(size, seed=0):
+    rnd = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rnd.choices(SYLLABLES, k=rnd.randint(2, 4))))
+    return sorted(words)
+
+
+def make_text(rnd, vocabulary, words):
+    return ' '.join(rnd.choices(vocabulary, k=words))
+
+
+def measure(func, repeat=20):
+    """Медиана и 95-й перцентиль времени вызова func в миллисекундах."""
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'median_ms': statistics.median(timings),
+        'p95_ms': timings[math.ceil(len(timings) * 0.95) - 1],
+    }
+
+
+def report(name, stats):
+    values = ', '.join(f'{key}={value:.3f}' for key, value in stats.items())
+    print(f'{name:<40} {values}')
@@ -1,6 +1,9 @@
 from django.contrib import admin
 
+from yanews.routers import read_from_replica
+
 from .models import Comment, News
+from .search import build_match_query, news_ids_matching
 
 
 class CommentInline(admin.StackedInline):
@@ -13,3 +16,17 @@ class NewsAdmin(admin.ModelAdmin):
     inlines = [
         CommentInline,
     ]
+    search_fields = ('title', 'text')
+
+    def changelist_view(self, request, extra_context=None):
+        """Список новостей в админке читается из копии базы."""
+        if request.method != 'GET':
+            return super().changelist_view(request, extra_context)
+        with read_from_replica():
+            return super().changelist_view(request, extra_context)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по полнотекстовому индексу вместо сканирования LIKE."""
+        if not build_match_query(search_term):
+            return queryset, False
+        return queryset.filter(id__in=news_ids_matching(search_term)), False
@@ -0,0 +1,78 @@
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .views import NewsArchive, NewsDetailView, NewsList
+
+_executor = None
+
+
+def get_executor():
+    """
+    Общий пул потоков для работы с ORM.
+
+    Размер пула ограничен настройкой NEWS_ASYNC_WORKERS, поэтому
+    столько же будет и соединений с базой данных.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.NEWS_ASYNC_WORKERS,
+            thread_name_prefix='news-orm',
+        )
+    return _executor
+
+
+def _call(func, *args, **kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def _render_view(view, request, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render') and callable(response.render):
+        response.render()
+    return response
+
+
+async def run_in_pool(func, *args, **kwargs):
+    """
+    Выполняет синхронный код в пуле, не блокируя цикл событий.
+
+    В отличие от sync_to_async(thread_sensitive=True), которым Django
+    запускает синхронные представления под ASGI, запросы не
+    выстраиваются в очередь к одному потоку.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), partial(context.run, _call, func, *args, **kwargs)
+    )
+
+
+def pooled_view(view):
+    """
+    Асинхронная обёртка синхронного представления.
+
+    Запросы к базе и рендеринг шаблона выполняются одной задачей
+    в пуле: цикл событий не блокируется, а поток переключается
+    только один раз на запрос.
+    """
+
+    async def async_view(request, *args, **kwargs):
+        return await run_in_pool(_render_view, view, request, *args, **kwargs)
+
+    async_view.__name__ = getattr(view, '__name__', 'async_view')
+    async_view.__doc__ = view.__doc__
+    return async_view
+
+
+news_list = pooled_view(NewsList.as_view())
+news_archive = pooled_view(NewsArchive.as_view())
+news_detail = pooled_view(NewsDetailView.as_view())
@@ -0,0 +1,191 @@
+import atexit
+import re
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from yanews.routers import read_source
+
+from .pagination import KeysetPaginator
+
+THREAD_KEY = 'news:thread:{news_id}:{version}:{source}:{cursor}'
+HITS_KEY = 'news:thread-stats:hits'
+MISSES_KEY = 'news:thread-stats:misses'
+PAGE_KEY = 'news:page:{alias}:{page}'
+PAGE_LOCK_KEY = 'news:page-lock:{alias}:{page}'
+# Как часто счётчики процесса добавляются к общим, в секундах.
+STATS_FLUSH_INTERVAL = 1
+# Пауза между проверками, пока страницу рендерит другой запрос.
+PAGE_WAIT_INTERVAL = 0.01
+ACTIONS_MARKER = re.compile(r'<!--comment-actions:(\d+):(\d+)-->')
+
+
+class _Stats:
+    """
+    Счётчики попаданий и промахов кеша веток.
+
+    Считаются в памяти процесса и не чаще раза в STATS_FLUSH_INTERVAL
+    секунд добавляются к общим счётчикам в кеше shared, откуда их
+    читает команда thread_cache_stats: запись в файловый кеш на
+    каждый запрос стоила бы дороже самого попадания.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = Counter()
+        self.flushed = time.monotonic()
+
+    def add(self, key):
+        with self.lock:
+            self.pending[key] += 1
+            if time.monotonic() - self.flushed < STATS_FLUSH_INTERVAL:
+                return
+        self.flush()
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, Counter()
+            self.flushed = time.monotonic()
+        if not pending:
+            return
+        shared = caches['shared']
+        for key, count in pending.items():
+            try:
+                shared.incr(key, count)
+            except ValueError:
+                if not shared.add(key, count, None):
+                    shared.incr(key, count)
+
+
+_stats = _Stats()
+atexit.register(_stats.flush)
+
+
+def thread_cache_stats():
+    """Попадания и промахи всех процессов."""
+    _stats.flush()
+    shared = caches['shared']
+    return {
+        'hits': shared.get(HITS_KEY, 0),
+        'misses': shared.get(MISSES_KEY, 0),
+    }
+
+
+def _render_actions(match, user):
+    comment_id, author_id = match.groups()
+    if user.pk is None or int(author_id) != user.pk:
+        return ''
+    return format_html(
+        '<a href="{}">Редактировать</a> |\n<a href="{}">Удалить</a>',
+        reverse('news:edit', args=(comment_id,)),
+        reverse('news:delete', args=(comment_id,)),
+    )
+
+
+def get_comment_paginator(news):
+    return KeysetPaginator(
+        news.comment_set.select_related('author'),
+        ('created', 'id'),
+        settings.COMMENTS_COUNT_ON_NEWS_PAGE,
+    )
+
+
+def render_comment_thread(news, user, cursor=None):
+    """
+    Возвращает HTML страницы ветки комментариев новости.
+
+    Фрагмент общий для всех пользователей: вместо ссылок
+    редактирования и удаления в нём стоят метки, которые
+    подменяются ссылками только для комментариев текущего
+    пользователя. Фрагменты из копии базы кешируются отдельно от
+    фрагментов из основной: иначе автор мог бы не увидеть свой
+    комментарий в странице, собранной по отстающей копии.
+    """
+    key = THREAD_KEY.format(
+        news_id=news.pk,
+        version=news.version,
+        source=read_source(),
+        cursor=cursor or '',
+    )
+    html = cache.get(key)
+    if html is None:
+        _stats.add(MISSES_KEY)
+        page = get_comment_paginator(news).page(cursor)
+        html = render_to_string('news/includes/comments.html', {
+            'news': news,
+            'cursor': cursor,
+            'page_obj': page,
+        })
+        cache.set(key, html, settings.NEWS_THREAD_CACHE_TIMEOUT)
+    else:
+        _stats.add(HITS_KEY)
+    return mark_safe(ACTIONS_MARKER.sub(
+        lambda match: _render_actions(match, user), html
+    ))
+
+
+def _wait_for_page(key, lock_key):
+    """
+    Ждёт, пока страницу отрендерит запрос, взявший блокировку.
+
+    None, если он закончил, не положив страницу в кеш, или не успел
+    за время блокировки.
+    """
+    deadline = time.monotonic() + settings.NEWS_PAGE_CACHE_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(PAGE_WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[2]
+        if cache.get(lock_key) is None:
+            return None
+    return None
+
+
+def cached_page(alias, page, version, render):
+    """
+    Ответ страницы из кеша с защитой от одновременных промахов.
+
+    Страница хранится под постоянным ключом вместе с версией, от
+    которой она построена. Пока версия та же и не истёк
+    NEWS_PAGE_CACHE_TIMEOUT, ответ отдаётся из кеша. Устаревшую
+    страницу перерисовывает один запрос, взявший блокировку, а
+    остальные ещё NEWS_PAGE_CACHE_STALE секунд получают старую.
+    Если страницы в кеше нет, остальные запросы ждут, пока её
+    отрендерит первый. Блокировка живёт в кеше по умолчанию,
+    поэтому промахи объединяются в пределах одного процесса.
+    """
+    key = PAGE_KEY.format(alias=alias, page=page)
+    lock_key = PAGE_LOCK_KEY.format(alias=alias, page=page)
+    lock_timeout = settings.NEWS_PAGE_CACHE_LOCK_TIMEOUT
+    entry = cache.get(key)
+    if entry is not None:
+        entry_version, fresh_until, response = entry
+        if entry_version == version and time.time() < fresh_until:
+            return response
+        if not cache.add(lock_key, True, lock_timeout):
+            return response
+    elif not cache.add(lock_key, True, lock_timeout):
+        response = _wait_for_page(key, lock_key)
+        if response is not None:
+            return response
+        return render()
+    try:
+        response = render()
+        if response.status_code == 200:
+            timeout = settings.NEWS_PAGE_CACHE_TIMEOUT
+            cache.set(
+                key,
+                (version, time.time() + timeout, response),
+                timeout + settings.NEWS_PAGE_CACHE_STALE,
+            )
+        return response
+    finally:
+        cache.delete(lock_key)
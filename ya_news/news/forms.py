@@ -2,6 +2,7 @@ from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
 from .models import Comment
+from .profanity import get_word_filter
 
 BAD_WORDS = (
     'редиска',
@@ -20,8 +21,9 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        bad_words = get_word_filter(BAD_WORDS).find_all(text)
+        if bad_words:
+            raise ValidationError(
+                WARNING, code='bad_words', params={'words': bad_words}
+            )
         return text
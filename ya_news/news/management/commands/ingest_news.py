@@ -0,0 +1,186 @@
+import json
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from news.models import News
+
+CHUNK_SIZE = 64 * 1024
+
+
+class JSONArrayReader:
+    """
+    Буфер для разбора JSON-массива по элементам.
+
+    Файл читается кусками, в памяти держится только текущий кусок
+    и незаконченный элемент.
+    """
+
+    def __init__(self, stream, chunk_size):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        if self.eof:
+            raise CommandError('Массив JSON не закрыт.')
+        more = self.stream.read(self.chunk_size)
+        self.buffer, self.pos = self.buffer[self.pos:] + more, 0
+        self.eof = not more
+
+    def next_char(self):
+        """Следующий значимый символ; пробелы и запятые пропускаются."""
+        while True:
+            while (self.pos < len(self.buffer)
+                   and self.buffer[self.pos] in ' \t\r\n,'):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            self.fill()
+
+    def decode(self):
+        while True:
+            try:
+                item, self.pos = self.decoder.raw_decode(
+                    self.buffer, self.pos
+                )
+                return item
+            except json.JSONDecodeError as error:
+                if self.eof:
+                    raise CommandError(f'Некорректный JSON: {error}')
+                self.fill()
+
+
+def iter_json_array(stream, chunk_size=CHUNK_SIZE):
+    """Элементы JSON-массива по одному."""
+    reader = JSONArrayReader(stream, chunk_size)
+    if reader.next_char() != '[':
+        raise CommandError('Ожидался массив JSON.')
+    reader.pos += 1
+    while reader.next_char() != ']':
+        yield reader.decode()
+
+
+def iter_json_lines(stream):
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+
+def iter_records(stream):
+    """Записи из JSON-массива или из JSON Lines, формат по первому символу."""
+    head = stream.read(1)
+    while head and head.isspace():
+        head = stream.read(1)
+    if not head:
+        return iter(())
+    if head == '[':
+        return iter_json_array(_Prepend(head, stream))
+    return iter_json_lines(_Prepend(head, stream))
+
+
+class _Prepend:
+    """Поток, которому вернули уже прочитанный первый символ."""
+
+    def __init__(self, head, stream):
+        self.head = head
+        self.stream = stream
+
+    def read(self, size=-1):
+        head, self.head = self.head, ''
+        return head + self.stream.read(size - len(head) if size > 0 else size)
+
+    def __iter__(self):
+        head, self.head = self.head, ''
+        for line in self.stream:
+            yield head + line
+            head = ''
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоковая загрузка новостей из JSON (в формате фикстуры '
+        'news.json) или JSON Lines. Новости с уже существующей парой '
+        '(заголовок, дата) пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл с новостями или - для stdin.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        path = options['path']
+        stream = (
+            sys.stdin if path == '-' else open(path, encoding='utf-8')
+        )
+        self.created = self.skipped = self.invalid = 0
+        start = time.perf_counter()
+        try:
+            batch = []
+            for record in iter_records(stream):
+                news = self.build_news(record)
+                if news is not None:
+                    batch.append(news)
+                if len(batch) >= batch_size:
+                    self.save_batch(batch)
+                    batch = []
+            if batch:
+                self.save_batch(batch)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = time.perf_counter() - start
+        total = self.created + self.skipped + self.invalid
+        self.stdout.write(
+            f'Создано: {self.created}, пропущено дублей: {self.skipped}, '
+            f'с ошибками: {self.invalid}. '
+            f'{total / elapsed if elapsed else 0:.0f} записей/с'
+        )
+
+    def build_news(self, record):
+        fields = record.get('fields', record) if isinstance(
+            record, dict
+        ) else None
+        try:
+            if fields is None:
+                raise ValidationError('Запись должна быть объектом.')
+            news = News(
+                title=fields.get('title', ''),
+                text=fields.get('text', ''),
+            )
+            if fields.get('date'):
+                news.date = fields['date']
+            news.clean_fields(exclude=('comment_count',))
+        except ValidationError as error:
+            self.invalid += 1
+            self.stderr.write(f'Пропущена запись {record!r}: {error}')
+            return None
+        return news
+
+    def save_batch(self, batch):
+        """Сохраняет пачку новостей одной транзакцией, отбрасывая дубли."""
+        with transaction.atomic():
+            existing = set(News.objects.filter(
+                date__in={news.date for news in batch},
+                title__in={news.title for news in batch},
+            ).values_list('title', 'date'))
+            new = []
+            for news in batch:
+                key = (news.title, news.date)
+                if key in existing:
+                    self.skipped += 1
+                    continue
+                existing.add(key)
+                new.append(news)
+            News.objects.bulk_create(new)
+        self.created += len(new)
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from news.models import Comment, News
+
+
+def rebuild_comment_count(news_model, comment_model):
+    """
+    Пересчитывает счётчики комментариев одним запросом UPDATE.
+
+    Версии новостей меняются тем же запросом: счётчики видны на
+    закешированных страницах.
+    """
+    counts = comment_model.objects.filter(
+        news=OuterRef('pk')
+    ).order_by().values('news').annotate(total=Count('pk')).values('total')
+    return news_model.objects.update(
+        comment_count=Coalesce(
+            Subquery(counts, output_field=IntegerField()), 0
+        ),
+        version=time.time_ns(),
+    )
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики комментариев новостей.'
+
+    def handle(self, *args, **options):
+        updated = rebuild_comment_count(News, Comment)
+        self.stdout.write(f'Пересчитано новостей: {updated}')
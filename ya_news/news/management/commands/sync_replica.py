@@ -0,0 +1,75 @@
+import time
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from yanews.routers import GENERATION_KEY, PRIMARY, REPLICA
+
+
+def data_version(connection):
+    """
+    PRAGMA data_version соединения с основной базой.
+
+    Меняется, когда другие соединения фиксируют изменения, поэтому
+    сравнивать значения можно только в пределах одного соединения.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA data_version')
+        return cursor.fetchone()[0]
+
+
+def copy_database(source, replica):
+    replica.ensure_connection()
+    source.connection.backup(replica.connection)
+
+
+def sync_replica(synced=None):
+    """
+    Копирует основную базу в копию через backup API SQLite.
+
+    Копия снимается с согласованного состояния базы, читатели копии
+    ждут окончания копирования по busy_timeout. После копирования
+    меняется версия копии в ключах кеша.
+
+    Возвращает состояние основной базы, с которого снята копия. Если
+    оно совпадает с synced, данные не менялись: копирование
+    пропускается, и закешированные страницы остаются действительными.
+    """
+    source, replica = connections[PRIMARY], connections[REPLICA]
+    source.ensure_connection()
+    state = (id(source.connection), data_version(source))
+    shared = caches['shared']
+    if state == synced and shared.get(GENERATION_KEY) is not None:
+        return state
+    copy_database(source, replica)
+    shared.set(GENERATION_KEY, time.time_ns(), None)
+    return state
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет копию базы для чтения. Запускается периодически '
+        'или с --interval работает постоянно.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять копирование каждые N секунд.',
+        )
+
+    def handle(self, *args, **options):
+        synced = None
+        while True:
+            start = time.perf_counter()
+            state = sync_replica(synced)
+            elapsed = time.perf_counter() - start
+            if state == synced:
+                self.stdout.write('Основная база не менялась')
+            else:
+                self.stdout.write(f'Копия обновлена за {elapsed:.3f} с')
+            synced = state
+            if not options['interval']:
+                return
+            time.sleep(max(options['interval'] - elapsed, 0))
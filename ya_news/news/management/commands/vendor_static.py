@@ -0,0 +1,39 @@
+import base64
+import hashlib
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from news.templatetags.assets import (
+    BOOTSTRAP_CDN_URL,
+    BOOTSTRAP_INTEGRITY,
+    BOOTSTRAP_STATIC_PATH,
+)
+
+
+def subresource_integrity(data):
+    digest = hashlib.sha384(data).digest()
+    return 'sha384-' + base64.b64encode(digest).decode()
+
+
+class Command(BaseCommand):
+    help = (
+        'Скачивает Bootstrap в static/ проекта и сверяет его с хешем '
+        'integrity из шаблона. Запускается при сборке перед '
+        'collectstatic; с BOOTSTRAP_VENDORED сайт тогда не обращается '
+        'к CDN.'
+    )
+
+    def handle(self, *args, **options):
+        with urlopen(BOOTSTRAP_CDN_URL, timeout=30) as response:
+            data = response.read()
+        if subresource_integrity(data) != BOOTSTRAP_INTEGRITY:
+            raise CommandError(
+                f'{BOOTSTRAP_CDN_URL} не совпадает с BOOTSTRAP_INTEGRITY.'
+            )
+        path = Path(settings.STATICFILES_DIRS[0]) / BOOTSTRAP_STATIC_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        self.stdout.write(f'Сохранено {len(data)} байт в {path}')
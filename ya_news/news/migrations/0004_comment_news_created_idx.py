@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_news_comment_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['news', 'created'], name='comment_news_created_idx'),
+        ),
+    ]
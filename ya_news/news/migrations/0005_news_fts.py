@@ -0,0 +1,57 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:10
+
+from django.db import migrations
+
+# Полнотекстовый индекс FTS5 поверх news_news (external content)
+# поддерживается триггерами. При пересоздании таблицы news_news
+# миграцией триггеры пропадут, и их нужно будет создать заново.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE news_news_fts USING fts5(
+        title, text,
+        content='news_news', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    "INSERT INTO news_news_fts(news_news_fts) VALUES('rebuild')",
+    """
+    CREATE TRIGGER news_news_fts_insert AFTER INSERT ON news_news BEGIN
+        INSERT INTO news_news_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER news_news_fts_delete AFTER DELETE ON news_news BEGIN
+        INSERT INTO news_news_fts(news_news_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER news_news_fts_update AFTER UPDATE OF title, text
+    ON news_news BEGIN
+        INSERT INTO news_news_fts(news_news_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO news_news_fts(rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+]
+
+DROP_FTS = [
+    'DROP TRIGGER news_news_fts_update',
+    'DROP TRIGGER news_news_fts_delete',
+    'DROP TRIGGER news_news_fts_insert',
+    'DROP TABLE news_news_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_comment_news_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_FTS, DROP_FTS),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:55
+
+import time
+
+from django.db import migrations, models
+
+
+def fill_version(apps, schema_editor):
+    apps.get_model('news', 'News').objects.update(version=time.time_ns())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_news_fts'),
+    ]
+
+    operations = [
+        # AddField пересоздал бы news_news вместе с триггерами индекса
+        # поиска (см. 0005_news_fts), поэтому столбец добавляется так.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'ALTER TABLE news_news '
+                    'ADD COLUMN version bigint NOT NULL DEFAULT 0',
+                    'ALTER TABLE news_news DROP COLUMN version',
+                ),
+            ],
+            state_operations=[
+                migrations.AddField(
+                    model_name='news',
+                    name='version',
+                    field=models.BigIntegerField(
+                        default=time.time_ns, editable=False
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(fill_version, migrations.RunPython.noop),
+    ]
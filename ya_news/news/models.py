@@ -1,16 +1,25 @@
+import time
 from datetime import datetime
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    # Время последнего изменения новости или её комментариев,
+    # в наносекундах: из него строятся ETag и ключи кеша страниц.
+    version = models.BigIntegerField(default=time.time_ns, editable=False)
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date', '-id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -32,6 +41,24 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'), name='comment_news_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def save(self, *args, **kwargs):
+        """
+        Новый комментарий увеличивает счётчик новости атомарно.
+
+        Любое сохранение меняет версию новости тем же запросом.
+        """
+        changes = {'version': time.time_ns()}
+        if self._state.adding:
+            changes['comment_count'] = F('comment_count') + 1
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            News.objects.filter(pk=self.news_id).update(**changes)
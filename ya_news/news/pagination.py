@@ -0,0 +1,105 @@
+import base64
+import json
+
+from django.db.models import Q
+from django.http import Http404
+
+
+class KeysetPage:
+    """Страница курсорной пагинации."""
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class KeysetPaginator:
+    """
+    Курсорная (keyset) пагинация по набору полей.
+
+    Вместо OFFSET следующая страница выбирается условием
+    «строго после последней записи предыдущей страницы», поэтому
+    при наличии индекса по полям сортировки страница N стоит
+    столько же, сколько первая.
+    Последнее поле должно быть уникальным (обычно это id).
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+        self.ordering = ordering
+        self.per_page = per_page
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name) for name, _ in self.fields]
+        # isoformat, в отличие от DjangoJSONEncoder, сохраняет микросекунды.
+        raw = json.dumps(values, default=lambda value: value.isoformat())
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Разбирает курсор; некорректный курсор — это 404."""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            model = self.queryset.model
+            return [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise Http404('Некорректный курсор страницы.')
+
+    def after(self, values):
+        """Условие «строго после» записи с заданными значениями полей."""
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            lookup = 'lt' if descending else 'gt'
+            step = Q(**{f'{name}__{lookup}': values[index]})
+            for (prev_name, _), prev_value in zip(
+                    self.fields[:index], values[:index]):
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        # Ограничение по первому полю даёт базе данных диапазон индекса,
+        # с которого начинать сканирование.
+        first_name, descending = self.fields[0]
+        lookup = 'lte' if descending else 'gte'
+        return Q(**{f'{first_name}__{lookup}': values[0]}) & condition
+
+    def cursor_ending_with(self, obj):
+        """
+        Курсор страницы, последней записью которой будет obj.
+
+        Нужен, чтобы после добавления записи сразу открыть страницу
+        с ней: берём запись, стоящую на per_page позиций раньше obj.
+        """
+        backwards = [
+            name if descending else f'-{name}'
+            for name, descending in self.fields
+        ]
+        previous = KeysetPaginator(self.queryset, backwards, self.per_page)
+        values = [getattr(obj, name) for name, _ in self.fields]
+        boundary = self.queryset.order_by(*backwards).filter(
+            previous.after(values)
+        )[self.per_page - 1:self.per_page]
+        for boundary_obj in boundary:
+            return self.encode_cursor(boundary_obj)
+        return None
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor)))
+        # Лишняя запись показывает, есть ли следующая страница.
+        object_list = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(object_list) > self.per_page:
+            object_list = object_list[:self.per_page]
+            next_cursor = self.encode_cursor(object_list[-1])
+        return KeysetPage(object_list, next_cursor)
@@ -0,0 +1,85 @@
+import os
+import re
+import threading
+
+from django.conf import settings
+
+
+def build_pattern(words):
+    """
+    Регулярное выражение, совпадающее с любым словом из списка.
+
+    Слова складываются в префиксное дерево, и выражение повторяет его
+    структуру: в каждой позиции текста движок regex проверяет только
+    ветки, совпадающие со следующим символом, а не все слова подряд.
+    """
+    trie = {}
+    for word in words:
+        word = word.strip().lower()
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def compile_node(node):
+        terminal = '' in node
+        branches = [
+            re.escape(char) + compile_node(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ''
+        if len(branches) == 1 and not terminal:
+            return branches[0]
+        group = f'(?:{"|".join(branches)})'
+        # Необязательная группа жадная: находится самое длинное слово.
+        return f'{group}?' if terminal else group
+
+    return re.compile(compile_node(trie) or '(?!)')
+
+
+class WordFilter:
+    """Поиск всех запрещённых слов в тексте за один проход."""
+
+    def __init__(self, words):
+        self.pattern = build_pattern(words)
+
+    def find_all(self, text):
+        return [match.group() for match in self.pattern.finditer(text.lower())]
+
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def read_words(path):
+    with open(path, encoding='utf-8') as file:
+        return [line for line in file if line.strip()]
+
+
+def get_word_filter(default_words):
+    """
+    Фильтр по словарю из настройки BAD_WORDS_FILE или по default_words.
+
+    Файл словаря перечитывается, как только меняется время его
+    изменения, поэтому обновлённый список начинает действовать
+    без перезапуска сервера.
+    """
+    path = settings.BAD_WORDS_FILE
+    if path:
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            path, key = None, default_words
+    else:
+        key = default_words
+    word_filter = _cache.get(key)
+    if word_filter is None:
+        with _lock:
+            words = read_words(path) if path else default_words
+            word_filter = WordFilter(words)
+            _cache.clear()
+            _cache[key] = word_filter
+    return word_filter
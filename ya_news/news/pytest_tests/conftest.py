@@ -1,18 +1,57 @@
 from datetime import datetime, timedelta
 
 import pytest
+from django.core.cache import caches
+from django.test import override_settings
 from django.test.client import Client
 from django.conf import settings
 from django.urls import reverse
 
+from news.cache import thread_cache_stats
 from news.models import News, Comment
 
 
+@pytest.fixture(scope='session', autouse=True)
+def memory_caches():
+    """
+    Кеши на время тестов хранятся в памяти процесса.
+
+    Файловые кеши сессий и версий общие с сервером: тесты не
+    должны ни читать, ни оставлять в них данные.
+    """
+    with override_settings(CACHES={
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+        }
+        for alias in settings.CACHES
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Счётчики, накопленные в процессе, сначала попадают в кеш.
+    thread_cache_stats()
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
 @pytest.fixture
 def home_url():
     return reverse('news:home')
 
 
+@pytest.fixture
+def archive_url():
+    return reverse('news:archive')
+
+
+@pytest.fixture
+def search_url():
+    return reverse('news:search')
+
+
 @pytest.fixture
 def news_detail_url(id_news_for_args):
     return reverse('news:detail', args=id_news_for_args)
@@ -114,6 +153,15 @@ def create_new_comment():
     return Comment.objects.bulk_create(all_comment)
 
 
+@pytest.fixture
+def create_comments_page(settings, news, author):
+    settings.COMMENTS_COUNT_ON_NEWS_PAGE = 3
+    return Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(settings.COMMENTS_COUNT_ON_NEWS_PAGE + 2)
+    )
+
+
 @pytest.fixture
 def id_for_args(comment):
     return (comment.id,)
@@ -1,11 +1,36 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from unittest.mock import Mock
+
 import pytest
 
+from asgiref.sync import async_to_sync
 from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory
+from django.urls import resolve, reverse
 
+from news import async_views, views
+from news.cache import (
+    HITS_KEY,
+    MISSES_KEY,
+    PAGE_LOCK_KEY,
+    cached_page,
+    thread_cache_stats,
+)
 from news.forms import CommentForm
+from news.models import News
+from yanews.asgi import AsyncViewsRequest
 
 pytestmark = pytest.mark.django_db
 
+HOME_URL = pytest.lazy_fixture('home_url')
+DETAIL_URL = pytest.lazy_fixture('news_detail_url')
+
 
 def test_anonymous_client_has_no_form(client, news_detail_url):
     """Анонимному пользователю недоступна форма комментария в новости."""
@@ -24,10 +49,20 @@ def test_news_count(client, home_url, create_news_test):
     """Количество новостей на главной странице — не более 10."""
     response = client.get(home_url)
     object_list = response.context['object_list']
-    news_count = object_list.count()
+    news_count = len(object_list)
     assert news_count == settings.NEWS_COUNT_ON_HOME_PAGE
 
 
+def test_home_page_single_query(client, home_url, create_news_test,
+                                django_assert_num_queries):
+    """
+    Главная страница вместе со счётчиками загружается одним запросом.
+    Ещё один запрос читает версии новостей для ETag.
+    """
+    with django_assert_num_queries(2):
+        client.get(home_url)
+
+
 def test_news_order(client, home_url, create_news_test):
     """Новости отсортированы от самой свежей к самой старой.
     Свежие новости в начале списка.
@@ -47,3 +82,253 @@ def test_comments_order(client, news_detail_url):
     all_timestamps = [comment.created for comment in all_comments]
     sorted_timestamps = sorted(all_timestamps)
     assert all_timestamps == sorted_timestamps
+
+
+def test_archive_continues_home_page(client, home_url, archive_url,
+                                     create_news_test):
+    """Архив по курсору продолжает ленту главной страницы без повторов."""
+    response = client.get(home_url)
+    page = response.context['page_obj']
+    assert page.has_next
+    home_ids = [news.id for news in response.context['object_list']]
+    response = client.get(archive_url, {'cursor': page.next_cursor})
+    archive_ids = [news.id for news in response.context['object_list']]
+    assert not response.context['page_obj'].has_next
+    assert set(home_ids).isdisjoint(archive_ids)
+    assert len(home_ids) + len(archive_ids) == len(create_news_test)
+
+
+def test_archive_invalid_cursor(client, archive_url):
+    """Некорректный курсор архива приводит к ошибке 404."""
+    response = client.get(archive_url, {'cursor': 'не-курсор'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comment_thread_cache_shared(author_client, not_author_client,
+                                     news_detail_url, news_edit_url):
+    """Ветка комментариев кешируется, но ссылки видит только автор."""
+    response = not_author_client.get(news_detail_url)
+    assert news_edit_url not in response.content.decode()
+    response = author_client.get(news_detail_url)
+    assert news_edit_url in response.content.decode()
+    assert thread_cache_stats() == {'hits': 1, 'misses': 1}
+
+
+def test_comment_thread_cache_invalidated(author_client, client, comment,
+                                          news_detail_url,
+                                          create_comment_test):
+    """Новый комментарий сразу появляется в закешированной ветке."""
+    client.get(news_detail_url)
+    author_client.post(news_detail_url, data=create_comment_test)
+    response = client.get(news_detail_url)
+    assert create_comment_test['text'] in response.content.decode()
+
+
+def test_comments_paginated(client, news_detail_url, create_comments_page):
+    """На странице новости выводится только первая страница комментариев."""
+    response = client.get(news_detail_url)
+    content = response.content.decode()
+    assert create_comments_page[0].text in content
+    assert create_comments_page[-1].text not in content
+    assert '?cursor=' in content
+
+
+@pytest.mark.parametrize('url', (HOME_URL, DETAIL_URL))
+def test_conditional_get(client, url, comment):
+    """Повторный запрос с валидаторами получает ответ 304."""
+    response = client.get(url)
+    assert response.has_header('ETag')
+    response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_last_modified_after_comment_edit(client, comment, news_detail_url):
+    """Правка комментария меняет Last-Modified страницы новости."""
+    response = client.get(news_detail_url)
+    last_modified = response['Last-Modified']
+    time.sleep(1)
+    comment.text = 'Исправленный текст'
+    comment.save()
+    response = client.get(
+        news_detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert 'Исправленный текст' in response.content.decode()
+
+
+@pytest.mark.parametrize('url', (HOME_URL, DETAIL_URL))
+def test_conditional_get_after_comment(client, author_client, url,
+                                       news_detail_url, create_comment_test):
+    """Новый комментарий меняет ETag главной и страницы новости."""
+    etag = client.get(url)['ETag']
+    author_client.post(news_detail_url, data=create_comment_test)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_no_validators_for_authorized(author_client, news_detail_url):
+    """Персональные страницы не получают валидаторов."""
+    response = author_client.get(news_detail_url)
+    assert not response.has_header('ETag')
+
+
+def test_search_ranks_and_highlights(client, search_url, news):
+    """Поиск находит новость по префиксу слова и выделяет совпадение."""
+    News.objects.create(title='Другая', text='Заголовок упомянут в тексте')
+    response = client.get(search_url, {'q': 'заголов'})
+    object_list = response.context['object_list']
+    assert [found.pk for found in object_list][0] == news.pk
+    assert len(object_list) == 2
+    assert '<mark>Заголовок</mark>' in object_list[1].snippet
+
+
+def test_search_index_follows_changes(client, search_url, news):
+    """Индекс поиска обновляется при изменении и удалении новости."""
+    news.title = 'Обновлённый'
+    news.save()
+    response = client.get(search_url, {'q': 'обновлённый'})
+    assert len(response.context['object_list']) == 1
+    news.delete()
+    response = client.get(search_url, {'q': 'обновлённый'})
+    assert len(response.context['object_list']) == 0
+
+
+def test_admin_search_uses_index(admin_client, news):
+    """Поиск в админке находит новость через полнотекстовый индекс."""
+    response = admin_client.get(
+        reverse('admin:news_news_changelist'), {'q': 'текст новост'}
+    )
+    assert list(response.context['cl'].result_list) == [news]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_render(news, comment):
+    """Асинхронные представления отдают ту же страницу, что и синхронные."""
+    request = AsyncRequestFactory().get('/')
+    request.user = AnonymousUser()
+    response = async_to_sync(async_views.news_detail)(request, pk=news.pk)
+    assert response.status_code == HTTPStatus.OK
+    assert comment.text in response.content.decode()
+
+
+def test_asgi_routes_to_async_views():
+    """Под ASGI главная и страница новости обслуживаются асинхронно."""
+    assert AsyncViewsRequest.urlconf == 'yanews.asgi_urls'
+    assert resolve('/', urlconf='yanews.asgi_urls').func is (
+        async_views.news_list
+    )
+    assert reverse('news:detail', args=(1,), urlconf='yanews.asgi_urls') == (
+        reverse('news:detail', args=(1,))
+    )
+
+
+def test_page_cache_for_anonymous(client, author_client, home_url,
+                                  create_news_test,
+                                  django_assert_num_queries):
+    """
+    Анонимный пользователь получает главную из кеша страниц.
+    Читаются только версии новостей для ETag.
+    """
+    client.get(home_url)
+    with django_assert_num_queries(1):
+        response = client.get(home_url)
+    assert response.status_code == HTTPStatus.OK
+    with django_assert_num_queries(1):
+        response = client.get(
+            home_url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = author_client.get(home_url)
+    assert 'Пользователь' in response.content.decode()
+
+
+def test_page_cache_invalidated_by_comment(client, author_client, news,
+                                           create_comment_test,
+                                           django_assert_num_queries):
+    """Новый комментарий сбрасывает только страницу своей новости."""
+    other = News.objects.create(title='Другая', text='Текст')
+    urls = [reverse('news:detail', args=(item.pk,)) for item in (news, other)]
+    for url in urls:
+        client.get(url)
+    author_client.post(urls[0], data=create_comment_test)
+    assert create_comment_test['text'] in client.get(urls[0]).content.decode()
+    with django_assert_num_queries(1):
+        client.get(urls[1])
+
+
+def test_page_cache_only_first_comment_page(monkeypatch, client,
+                                            news_detail_url):
+    """Страницы с курсором из запроса в кеш страниц не попадают."""
+    cached = Mock(wraps=cached_page)
+    monkeypatch.setattr(views, 'cached_page', cached)
+    client.get(news_detail_url)
+    for cursor in ('a', 'b', 'c'):
+        client.get(news_detail_url, {'cursor': cursor})
+    cached.assert_called_once()
+
+
+def test_page_cache_single_flight():
+    """Одновременные промахи рендерят страницу один раз."""
+    renders = []
+
+    def render():
+        renders.append(1)
+        time.sleep(0.05)
+        return HttpResponse('страница')
+
+    with ThreadPoolExecutor(8) as executor:
+        responses = list(executor.map(
+            lambda _: cached_page('default', 'test', 1, render), range(8)
+        ))
+    assert len(renders) == 1
+    assert {response.content for response in responses} == {
+        'страница'.encode()
+    }
+
+
+def test_page_cache_serves_stale_while_rendering():
+    """Пока страницу перерисовывает другой запрос, отдаётся старая."""
+    cached_page('default', 'test', 1, lambda: HttpResponse('старая'))
+    cache.add(PAGE_LOCK_KEY.format(alias='default', page='test'), True)
+    response = cached_page(
+        'default', 'test', 2, lambda: HttpResponse('новая')
+    )
+    assert response.content == 'старая'.encode()
+
+
+def test_missing_news_not_cached(settings, tmp_path, client):
+    """Запрос несуществующей новости ничего не пишет в кеши."""
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tmp_path,
+    }}
+    response = client.get(reverse('news:detail', args=(987654321,)))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize('url', (HOME_URL, DETAIL_URL))
+def test_etag_changes_on_news_edit(client, news, url):
+    """Правка новости меняет ETag главной и страницы новости."""
+    etag = client.get(url)['ETag']
+    news.title = 'Новый заголовок'
+    news.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Новый заголовок' in response.content.decode()
+
+
+def test_stats_visible_to_other_processes(settings, tmp_path,
+                                          author_client, not_author_client,
+                                          news_detail_url):
+    """Команда видит счётчики, накопленные процессом сервера."""
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tmp_path,
+    }}
+    not_author_client.get(news_detail_url)
+    author_client.get(news_detail_url)
+    thread_cache_stats()
+    other_process = FileBasedCache(str(tmp_path), {})
+    assert other_process.get(HITS_KEY) == 1
+    assert other_process.get(MISSES_KEY) == 1
@@ -1,10 +1,24 @@
+import json
+import logging
+import os
 from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 from pytest_django.asserts import assertRedirects, assertFormError
 
-from news.models import Comment
 from news.forms import BAD_WORDS, WARNING
+from news.management.commands import sync_replica as sync_replica_command
+from news.management.commands.ingest_news import iter_json_array
+from news.models import Comment, News
+from news.profanity import WordFilter, get_word_filter
+from yanews import routers
 
 pytestmark = pytest.mark.django_db
 
@@ -94,3 +108,191 @@ def test_user_cant_delete_comment_of_another_user(not_author_client,
     response = not_author_client.post(news_delete_url)
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert Comment.objects.count() == comment_count
+
+
+def test_comment_count_follows_comments(author_client,
+                                        create_comment_test,
+                                        news_detail_url,
+                                        news):
+    """Счётчик комментариев новости меняется при создании и удалении."""
+    author_client.post(news_detail_url, data=create_comment_test)
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    Comment.objects.filter(news=news).delete()
+    news.refresh_from_db()
+    assert news.comment_count == 0
+
+
+def test_rebuild_comment_count(comment, news):
+    """Команда rebuild_comment_count восстанавливает счётчики."""
+    News.objects.update(comment_count=100)
+    call_command('rebuild_comment_count', stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == 1
+
+
+def test_redirect_to_page_with_new_comment(author_client,
+                                           create_comment_test,
+                                           news_detail_url,
+                                           create_comments_page):
+    """После отправки комментария открывается страница, где он виден."""
+    response = author_client.post(news_detail_url, data=create_comment_test)
+    assert '?cursor=' in response.url
+    response = author_client.get(response.url)
+    assert create_comment_test['text'] in response.content.decode()
+
+
+def test_slow_query_log(settings, client, caplog, news_detail_url):
+    """Медленные запросы пишутся в лог с планом и именем маршрута."""
+    settings.SLOW_QUERY_LOG = True
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    with caplog.at_level(logging.INFO, logger='yanews.sql'):
+        client.get(news_detail_url)
+    records = [json.loads(record.message) for record in caplog.records]
+    slow_queries = [rec for rec in records if rec['event'] == 'slow_query']
+    summary = records[-1]
+    assert summary['view'] == 'news:detail'
+    assert summary['queries'] == len(slow_queries) > 0
+    assert all(query['plan'] for query in slow_queries)
+
+
+def test_ingest_news_is_idempotent():
+    """Загрузка фикстуры создаёт новости, повторная — ничего не дублирует."""
+    fixture = Path(__file__).resolve().parent.parent / 'fixtures/news.json'
+    with open(fixture, encoding='utf-8') as file:
+        expected = len(json.load(file))
+    call_command('ingest_news', str(fixture), batch_size=5, stdout=StringIO())
+    assert News.objects.count() == expected
+    call_command('ingest_news', str(fixture), stdout=StringIO())
+    assert News.objects.count() == expected
+
+
+def test_ingest_news_json_lines(tmp_path):
+    """Поддерживается формат JSON Lines; ошибочные записи пропускаются."""
+    path = tmp_path / 'news.jsonl'
+    path.write_text(
+        '{"title": "Первая", "text": "Текст", "date": "2022-01-01"}\n'
+        '{"title": "' + 'Очень длинно' * 10 + '", "text": "Текст"}\n'
+        '{"title": "Вторая", "text": "Текст", "date": "2022-01-02"}\n',
+        encoding='utf-8',
+    )
+    call_command('ingest_news', str(path), stdout=StringIO(),
+                 stderr=StringIO())
+    assert sorted(News.objects.values_list('title', flat=True)) == [
+        'Вторая', 'Первая'
+    ]
+
+
+def test_iter_json_array_small_chunks():
+    """Массив JSON разбирается по элементам при любом размере куска."""
+    items = [{'title': f'Новость {index}'} for index in range(20)]
+    stream = StringIO(json.dumps(items, ensure_ascii=False))
+    assert list(iter_json_array(stream, chunk_size=7)) == items
+
+
+def test_word_filter_finds_all_words():
+    """Фильтр находит все запрещённые слова за один проход."""
+    word_filter = WordFilter(('редис', 'редиска', 'негодяй', 'дурак'))
+    text = 'Редиска и НЕГОДЯЙ, а ещё редис.'
+    assert word_filter.find_all(text) == ['редиска', 'негодяй', 'редис']
+    assert WordFilter(()).find_all(text) == []
+
+
+def test_bad_words_file_hot_reload(settings, tmp_path):
+    """Словарь из файла подхватывается заново после его изменения."""
+    path = tmp_path / 'bad_words.txt'
+    path.write_text('бяка\n', encoding='utf-8')
+    settings.BAD_WORDS_FILE = str(path)
+    assert get_word_filter(BAD_WORDS).find_all('Бяка!') == ['бяка']
+    path.write_text('злюка\n', encoding='utf-8')
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+    assert get_word_filter(BAD_WORDS).find_all('Бяка, злюка!') == ['злюка']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sqlite_connection_pragmas(settings):
+    """Соединение получает PRAGMA из настроек и BEGIN IMMEDIATE."""
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA busy_timeout')
+        assert cursor.fetchone()[0] == settings.SQLITE_PRAGMAS['busy_timeout']
+        cursor.execute('PRAGMA synchronous')
+        assert cursor.fetchone()[0] == 1
+    with CaptureQueriesContext(connection) as queries, transaction.atomic():
+        Comment.objects.count()
+    assert queries.captured_queries[0]['sql'] == 'BEGIN IMMEDIATE'
+
+
+def test_author_reads_primary_after_comment(author_client, client,
+                                            news_detail_url,
+                                            create_comment_test):
+    """После комментария автор какое-то время читает из основной базы."""
+    response = author_client.post(news_detail_url, data=create_comment_test)
+    assert 'primary_until' in response.cookies
+    assert 'primary_until' not in client.get(news_detail_url).cookies
+
+
+def test_replica_router(monkeypatch):
+    """Чтения в копию только внутри read_from_replica и до первой записи."""
+    monkeypatch.setattr(routers, 'replica_generation', lambda: 1)
+    router = routers.PrimaryReplicaRouter()
+    with routers.request_state():
+        assert router.db_for_read(News) == routers.PRIMARY
+        with routers.read_from_replica():
+            assert router.db_for_read(News) == routers.REPLICA
+            assert router.db_for_write(Comment) == routers.PRIMARY
+            assert router.db_for_read(News) == routers.PRIMARY
+    with routers.request_state(sticky=True):
+        with routers.read_from_replica():
+            assert router.db_for_read(News) == routers.PRIMARY
+
+
+def test_sticky_author_reads_primary(monkeypatch, author_client,
+                                     news_detail_url, create_comment_test):
+    """Пока действует cookie, страница новости читается из основной базы."""
+    monkeypatch.setattr(routers, 'replica_generation', lambda: 1)
+    db_for_read = routers.PrimaryReplicaRouter.db_for_read
+    reads = []
+
+    def record_read(self, model, **hints):
+        # Тестовая копия — отдельное соединение к той же базе в памяти,
+        # и оно не видит данных незавершённой транзакции теста.
+        reads.append(db_for_read(self, model, **hints))
+        return routers.PRIMARY
+
+    monkeypatch.setattr(
+        routers.PrimaryReplicaRouter, 'db_for_read', record_read
+    )
+    author_client.get(news_detail_url)
+    assert routers.REPLICA in reads
+    author_client.post(news_detail_url, data=create_comment_test)
+    reads.clear()
+    response = author_client.get(news_detail_url)
+    assert create_comment_test['text'] in response.content.decode()
+    assert reads and routers.REPLICA not in reads
+
+
+@pytest.fixture
+def replica_shared_cache(settings):
+    """Версия копии пишется в отдельный кеш, а не в общий кеш сервера."""
+    settings.CACHES = {**settings.CACHES, 'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'replica-sync',
+    }}
+    yield caches['shared']
+    caches['shared'].clear()
+
+
+def test_sync_replica_skips_unchanged_data(monkeypatch, replica_shared_cache):
+    """Версия копии меняется, только если изменилась основная база."""
+    monkeypatch.setattr(sync_replica_command, 'copy_database', Mock())
+    state = sync_replica_command.sync_replica()
+    generation = routers.replica_generation()
+    assert generation is not None
+    assert sync_replica_command.sync_replica(state) == state
+    assert routers.replica_generation() == generation
+    sync_replica_command.copy_database.assert_called_once()
+    monkeypatch.setattr(
+        sync_replica_command, 'data_version', lambda connection: -1
+    )
+    assert sync_replica_command.sync_replica(state) != state
+    assert routers.replica_generation() != generation
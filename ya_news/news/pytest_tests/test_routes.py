@@ -1,13 +1,26 @@
+import gzip
 from http import HTTPStatus
 
 import pytest
 from pytest_django.asserts import assertRedirects
+from django.core.management import call_command
+from django.db import connection
+from django.templatetags.static import static
 from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from news.templatetags.assets import (
+    BOOTSTRAP_CDN_URL,
+    check_vendored_bootstrap,
+)
+from yanews.middleware import StaticFilesMiddleware
 
 pytestmark = pytest.mark.django_db
 
 
 HOME_URL = pytest.lazy_fixture('home_url')
+ARCHIVE_URL = pytest.lazy_fixture('archive_url')
+SEARCH_URL = pytest.lazy_fixture('search_url')
 LOGIN_URL = pytest.lazy_fixture('users_login_url')
 LOGOUT_URL = pytest.lazy_fixture('users_logout_url')
 SINGUP_URL = pytest.lazy_fixture('users_singnup_url')
@@ -22,6 +35,8 @@ CLIENT_NOT_AUTHORIZATION = Client()
 @pytest.mark.parametrize(
     'name, client_test, expected_status',
     ((HOME_URL, CLIENT_NOT_AUTHORIZATION, HTTPStatus.OK),
+     (ARCHIVE_URL, CLIENT_NOT_AUTHORIZATION, HTTPStatus.OK),
+     (SEARCH_URL, CLIENT_NOT_AUTHORIZATION, HTTPStatus.OK),
      (LOGIN_URL, CLIENT_NOT_AUTHORIZATION, HTTPStatus.OK),
      (LOGOUT_URL, CLIENT_NOT_AUTHORIZATION, HTTPStatus.OK),
      (SINGUP_URL, CLIENT_NOT_AUTHORIZATION, HTTPStatus.OK),
@@ -54,3 +69,64 @@ def test_redirect_for_anonymous_client(client, name, users_login_url):
     expected_url = f'{users_login_url}?next={name}'
     response = client.get(name)
     assertRedirects(response, expected_url)
+
+
+def test_session_and_user_from_cache(author_client, news_detail_url):
+    """Сессия и пользователь не читаются из базы на каждом запросе."""
+    author_client.get(news_detail_url)
+    with CaptureQueriesContext(connection) as queries:
+        author_client.get(news_detail_url)
+    tables = ' '.join(query['sql'] for query in queries)
+    assert 'django_session' not in tables
+    assert 'auth_user' not in tables
+
+
+def test_logout_ends_cached_session(author_client, users_logout_url,
+                                    news_edit_url, users_login_url):
+    """После выхода закешированная сессия больше не действует."""
+    author_client.get(news_edit_url)
+    author_client.get(users_logout_url)
+    response = author_client.get(news_edit_url)
+    assertRedirects(response, f'{users_login_url}?next={news_edit_url}')
+
+
+def test_static_files_compressed_and_immutable(settings, tmp_path, rf):
+    """Статика с хешем в имени отдаётся сжатой и кешируется на год."""
+    source = tmp_path / 'static'
+    (source / 'vendor').mkdir(parents=True)
+    css = b'.btn { color: red; }\n' * 100
+    (source / 'vendor' / 'site.css').write_bytes(css)
+    settings.STATICFILES_DIRS = [source]
+    settings.STATIC_ROOT = tmp_path / 'root'
+    settings.STATICFILES_STORAGE = (
+        'yanews.storage.CompressedManifestStaticFilesStorage'
+    )
+    call_command('collectstatic', interactive=False, verbosity=0)
+    middleware = StaticFilesMiddleware(lambda request: None)
+    url = static('vendor/site.css')
+    assert url != '/static/vendor/site.css'
+    response = middleware(rf.get(url, HTTP_ACCEPT_ENCODING='gzip'))
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'immutable' in response['Cache-Control']
+    assert gzip.decompress(b''.join(response.streaming_content)) == css
+    response = middleware(rf.get('/static/vendor/site.css'))
+    assert 'Content-Encoding' not in response
+    assert 'immutable' not in response['Cache-Control']
+
+
+def test_bootstrap_falls_back_to_cdn(settings, tmp_path, client, home_url):
+    """Без собранного Bootstrap продакшен-профиль ссылается на CDN."""
+    settings.STATICFILES_DIRS = [tmp_path / 'static']
+    settings.STATIC_ROOT = tmp_path / 'root'
+    settings.STATICFILES_STORAGE = (
+        'yanews.storage.CompressedManifestStaticFilesStorage'
+    )
+    settings.BOOTSTRAP_VENDORED = True
+    (tmp_path / 'static').mkdir()
+    call_command('collectstatic', interactive=False, verbosity=0)
+    response = client.get(home_url)
+    assert response.status_code == HTTPStatus.OK
+    assert BOOTSTRAP_CDN_URL in response.content.decode()
+    assert [error.id for error in check_vendored_bootstrap(None)] == [
+        'news.W001'
+    ]
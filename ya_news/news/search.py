@@ -0,0 +1,62 @@
+import re
+
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import News
+
+# Границы совпадений в snippet(): управляющие символы не встречаются
+# в тексте новостей и переживают экранирование HTML.
+MATCH_START = '\x02'
+MATCH_END = '\x03'
+
+SEARCH_SQL = f"""
+    SELECT news_news.id, news_news.title, news_news.date,
+           snippet(news_news_fts, 1, '{MATCH_START}', '{MATCH_END}',
+                   '…', 16) AS snippet
+    FROM news_news_fts
+    JOIN news_news ON news_news.id = news_news_fts.rowid
+    WHERE news_news_fts MATCH %s
+    ORDER BY bm25(news_news_fts, 10.0, 1.0)
+    LIMIT %s
+"""
+
+
+def build_match_query(query):
+    """
+    Переводит пользовательский запрос в выражение FTS5.
+
+    Каждое слово ищется по префиксу, слова объединяются через AND.
+    Кавычки не дают пользователю использовать синтаксис FTS5.
+    """
+    terms = re.findall(r'\w+', query.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def highlight(snippet):
+    """Экранирует фрагмент текста и выделяет совпадения тегом mark."""
+    return mark_safe(
+        escape(snippet)
+        .replace(MATCH_START, '<mark>')
+        .replace(MATCH_END, '</mark>')
+    )
+
+
+def search_news(query, limit):
+    """Новости, подходящие под запрос, от наиболее релевантной."""
+    match = build_match_query(query)
+    if not match:
+        return []
+    results = list(News.objects.raw(SEARCH_SQL, (match, limit)))
+    for news in results:
+        news.snippet = highlight(news.snippet)
+    return results
+
+
+def news_ids_matching(query):
+    """Подзапрос id новостей для фильтрации QuerySet, например в админке."""
+    return RawSQL(
+        'SELECT rowid FROM news_news_fts WHERE news_news_fts MATCH %s',
+        (build_match_query(query),),
+    )
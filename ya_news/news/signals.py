@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from yanews.auth import invalidate_user
+
+from .models import Comment, News
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшаем счётчик комментариев новости и меняем её версию.
+
+    Сигнал, а не Comment.delete, нужен потому, что админка удаляет
+    комментарии через QuerySet.delete. Удаление выполняется внутри
+    транзакции, поэтому счётчик меняется атомарно вместе с ним.
+    """
+    News.objects.filter(pk=instance.news_id).update(
+        comment_count=F('comment_count') - 1, version=time.time_ns()
+    )
+
+
+@receiver(pre_save, sender=News)
+def touch_news(sender, instance, **kwargs):
+    """Правка новости меняет её страницу и ленту."""
+    instance.version = time.time_ns()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
@@ -6,6 +6,8 @@ app_name = 'news'
 
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
+    path('archive/', views.NewsArchive.as_view(), name='archive'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
     path(
         'delete_comment/<int:pk>/',
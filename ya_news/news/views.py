@@ -1,42 +1,275 @@
+import hashlib
+from calendar import timegm
+from datetime import datetime
+
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import router
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
 from django.views import generic
 
+from yanews.routers import read_from_replica, read_source
+
+from .cache import (
+    cached_page,
+    get_comment_paginator,
+    render_comment_thread,
+)
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import KeysetPaginator
+from .search import search_news
+
+
+class ConditionalGetMixin:
+    """
+    Условный GET для анонимных пользователей.
+
+    Валидаторы ETag и Last-Modified вычисляются без рендеринга
+    шаблона; если страница не изменилась, возвращается ответ 304.
+    Страницы авторизованных пользователей персональны
+    и не проверяются.
+    """
+
+    def get_etag(self):
+        return None
+
+    def get_last_modified(self):
+        return None
+
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return super().get(request, *args, **kwargs)
+        etag = self.get_etag()
+        etag = quote_etag(str(etag)) if etag is not None else None
+        last_modified = self.get_last_modified()
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if etag:
+            response.headers.setdefault('ETag', etag)
+        if last_modified:
+            response.headers.setdefault(
+                'Last-Modified', http_date(last_modified)
+            )
+        return response
+
+
+class ReplicaReadMixin:
+    """Страница только читает данные и может читать их из копии базы."""
+
+    def get(self, request, *args, **kwargs):
+        with read_from_replica():
+            return super().get(request, *args, **kwargs)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кеш целых страниц для анонимных пользователей.
+
+    Страница считается актуальной, пока не изменился её ETag, поэтому
+    новый комментарий сбрасывает только страницу своей новости и
+    главную. Условный GET проверяется по заголовкам закешированного
+    ответа: устаревшая страница отдаётся со своим старым ETag.
+    """
 
+    def get_page_cache_key(self):
+        return None
 
-class NewsList(generic.ListView):
+    def render_page(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    def get(self, request, *args, **kwargs):
+        page = self.get_page_cache_key()
+        if request.user.is_authenticated or page is None:
+            return super().get(request, *args, **kwargs)
+        version = self.get_etag()
+        if version is None:
+            return super().get(request, *args, **kwargs)
+        response = cached_page(
+            router.db_for_read(self.model),
+            page,
+            version,
+            lambda: self.render_page(request, *args, **kwargs),
+        )
+        if response.status_code != 200:
+            return response
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')
+            ),
+            response=response,
+        )
+
+
+class NewsList(
+        ReplicaReadMixin,
+        AnonymousPageCacheMixin,
+        ConditionalGetMixin,
+        generic.ListView,
+):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
+    ordering = ('-date', '-id')
 
-    def get_queryset(self):
+    def get_cursor(self):
+        """На главной всегда выводятся самые свежие новости."""
+        return None
+
+    def get_page_cache_key(self):
+        return 'home'
+
+    @cached_property
+    def page_versions(self):
+        """
+        Новости страницы с их версиями.
+
+        Читаются по тому же индексу, что и сама страница, и только
+        нужные для ETag поля.
         """
-        Выводим только несколько последних новостей.
+        page = KeysetPaginator(
+            self.model.objects.only('id', 'date', 'version'),
+            self.ordering,
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+        ).page(self.get_cursor())
+        return [
+            (news.id, news.version) for news in page.object_list
+        ], page.has_next
 
-        Их количество определяется в настройках проекта.
+    def get_etag(self):
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        Тег строится из версий новостей страницы.
 
+        Версия меняется при правке новости и её комментариев,
+        а добавление и удаление новостей меняет их набор.
+        """
+        digest = hashlib.sha256(
+            repr(self.page_versions).encode()
+        ).hexdigest()[:32]
+        return f'feed-{digest}-{read_source()}'
+
+    def get_last_modified(self):
+        """
+        Лента проверяется только по ETag.
 
-class NewsDetail(generic.DetailView):
+        Время из версий не подходит: после удаления новости самая
+        поздняя версия на странице может стать раньше прежней.
+        """
+        return None
+
+    def get_context_data(self, **kwargs):
+        """
+        Выводим одну страницу новостей.
+
+        Размер страницы определяется в настройках проекта,
+        более старые новости доступны в архиве по курсору.
+        """
+        page = KeysetPaginator(
+            self.object_list,
+            self.ordering,
+            settings.NEWS_COUNT_ON_HOME_PAGE,
+        ).page(self.get_cursor())
+        kwargs.update(object_list=page.object_list, page_obj=page)
+        return super().get_context_data(**kwargs)
+
+
+class NewsArchive(NewsList):
+    """Архив новостей с курсорной пагинацией."""
+
+    def get_cursor(self):
+        return self.request.GET.get('cursor')
+
+    def get_page_cache_key(self):
+        """Страницы архива в кеш страниц не попадают."""
+        return None
+
+
+class NewsSearch(generic.ListView):
+    """Полнотекстовый поиск по новостям."""
+    template_name = 'news/search.html'
+
+    def get_queryset(self):
+        return search_news(
+            self.request.GET.get('q', ''), settings.NEWS_SEARCH_RESULTS
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+def get_comment_url(comment):
+    """Адрес страницы новости, на которой виден комментарий."""
+    url = reverse('news:detail', kwargs={'pk': comment.news_id})
+    cursor = get_comment_paginator(comment.news).cursor_ending_with(comment)
+    if cursor:
+        url += f'?cursor={cursor}'
+    return url + '#comments'
+
+
+class NewsDetail(
+        ReplicaReadMixin,
+        AnonymousPageCacheMixin,
+        ConditionalGetMixin,
+        generic.DetailView,
+):
     model = News
     template_name = 'news/detail.html'
 
+    def get_page_cache_key(self):
+        """
+        В кеш страниц попадает только первая страница комментариев.
+
+        Курсор приходит от клиента, и каждый новый курсор занимал бы
+        в кеше отдельную запись.
+        """
+        if self.request.GET.get('cursor'):
+            return None
+        return f'detail:{self.kwargs["pk"]}'
+
+    @cached_property
+    def version(self):
+        """Версия новости или None, если новости нет."""
+        return self.model.objects.filter(pk=self.kwargs['pk']).values_list(
+            'version', flat=True
+        ).first()
+
+    def get_etag(self):
+        """Для несуществующей новости ETag нет, и страница не кешируется."""
+        if self.version is None:
+            return None
+        return f'news-{self.kwargs["pk"]}-{self.version}-{read_source()}'
+
+    def get_last_modified(self):
+        """Время версии: меняется при любой правке новости и комментариев."""
+        if self.version is None:
+            return None
+        return datetime.fromtimestamp(self.version / 10 ** 9, timezone.utc)
+
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context['comments_html'] = render_comment_thread(
+            self.object, self.request.user, self.request.GET.get('cursor')
+        )
         if self.request.user.is_authenticated:
             context['form'] = CommentForm()
         return context
@@ -60,11 +293,11 @@ class NewsComment(
         comment.news = self.object
         comment.author = self.request.user
         comment.save()
+        self.comment = comment
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return get_comment_url(self.comment)
 
 
 class NewsDetailView(generic.View):
@@ -83,10 +316,7 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
-        return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
-        ) + '#comments'
+        return get_comment_url(self.object)
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
@@ -10,7 +10,15 @@ https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.handlers.asgi import ASGIRequest
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanews.settings')
 
+
+class AsyncViewsRequest(ASGIRequest):
+    """Запросы ASGI обслуживаются асинхронными представлениями чтения."""
+    urlconf = 'yanews.asgi_urls'
+
+
 application = get_asgi_application()
+application.request_class = AsyncViewsRequest
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from django.urls import include, path
+
+from .urls import auth_urls
+
+urlpatterns = [
+    path('', include('news.async_urls')),
+    path('admin/', admin.site.urls),
+    path('auth/', include(auth_urls)),
+]
@@ -0,0 +1,48 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db import transaction
+
+USER_KEY = 'auth:user:{pk}'
+
+
+def user_cache():
+    """Пользователи кешируются рядом с сессиями."""
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def invalidate_user(pk):
+    """
+    Удаляет пользователя из кеша сразу и после фиксации транзакции.
+
+    Второй сброс нужен, если другой запрос успел прочитать из базы
+    старую запись и положить её в кеш до фиксации.
+    """
+    key = USER_KEY.format(pk=pk)
+    user_cache().delete(key)
+    transaction.on_commit(lambda: user_cache().delete(key))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который берёт пользователя сессии из кеша.
+
+    AuthenticationMiddleware запрашивает пользователя на каждом
+    запросе; из базы он читается только при промахе. Запись
+    сбрасывается при любом сохранении или удалении пользователя
+    (в том числе при смене пароля) и при выходе. QuerySet.update()
+    сигналов не отправляет: изменения, сделанные им (например,
+    блокировка через is_active), видны не позже чем через
+    AUTH_USER_CACHE_TIMEOUT, а сразу — после invalidate_user().
+    """
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(pk=user_id)
+        user = user_cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache().set(
+                    key, user, settings.AUTH_USER_CACHE_TIMEOUT
+                )
+        return user
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+GENERATION_KEY = 'replica:generation'
+
+_state = ContextVar('replica_state', default=None)
+
+
+class RequestState:
+    """
+    Откуда читать в рамках одного HTTP-запроса.
+
+    sticky — автор недавно писал и должен видеть свои изменения,
+    generation — версия копии, из которой читает запрос, или None,
+    если запрос читает из основной базы.
+    """
+
+    def __init__(self, sticky=False):
+        self.sticky = sticky
+        self.wrote = False
+        self.generation = None
+
+
+def replica_generation():
+    """
+    Версия копии базы: меняется, когда sync_replica копирует в неё
+    изменившиеся данные.
+
+    Хранится в общем кеше, чтобы её видели все процессы сервера.
+    None, если копии нет или она ещё не синхронизирована: тогда все
+    чтения идут в основную базу.
+    """
+    if REPLICA not in settings.DATABASES:
+        return None
+    return caches['shared'].get(GENERATION_KEY)
+
+
+@contextmanager
+def request_state(sticky=False):
+    """Состояние маршрутизации на время обработки запроса."""
+    state = RequestState(sticky)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+@contextmanager
+def read_from_replica():
+    """
+    Разрешает читать из копии внутри блока.
+
+    Чтения остаются в основной базе, если автор недавно писал,
+    если в этом же запросе уже была запись или если копии нет.
+    """
+    state = _state.get()
+    if state is None or state.sticky or state.generation is not None:
+        yield
+        return
+    state.generation = replica_generation()
+    try:
+        yield
+    finally:
+        state.generation = None
+
+
+def read_source():
+    """
+    Метка базы, из которой сейчас идут чтения.
+
+    Входит в ключи кеша и ETag, чтобы страница, собранная по
+    отстающей копии, не выдавалась за страницу из основной базы.
+    """
+    state = _state.get()
+    if state is None or state.generation is None or state.wrote:
+        return PRIMARY
+    return f'{REPLICA}-{state.generation}'
+
+
+class PrimaryReplicaRouter:
+    """
+    Записи — в основную базу, чтения — в копию, где это разрешено.
+
+    Копия читается только внутри read_from_replica(), всё остальное,
+    включая чтения в тех же запросах, что и записи, идёт в основную
+    базу.
+    """
+
+    def db_for_read(self, model, **hints):
+        if read_source() == PRIMARY:
+            return PRIMARY
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
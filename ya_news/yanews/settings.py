@@ -21,6 +21,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanews.middleware.SlowQueryLogMiddleware',
+    'yanews.middleware.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,17 +53,104 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+# Параметры соединений SQLite, см. yanews.db.base.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в килобайтах.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yanews.db',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+    # Копия основной базы для чтения ленты и страниц новостей.
+    # Обновляется командой sync_replica; пока она не выполнялась,
+    # все чтения идут в default.
+    'replica': {
+        'ENGINE': 'yanews.db',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+        },
+        'TEST': {
+            'MIRROR': 'default',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['yanews.routers.PrimaryReplicaRouter']
+
+# Сколько секунд после записи пользователь читает из основной базы.
+REPLICA_STICKY_SECONDS = 10
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Счётчики кеша и версия копии базы, общие для всех процессов
+    # сервера и команд manage.py, см. news.cache и yanews.routers.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'shared',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Сессии и пользователи сессий, см. yanews.auth. Кеш файловый,
+    # чтобы выход и смена пароля были видны всем процессам сервера.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
 }
 
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+AUTHENTICATION_BACKENDS = ['yanews.auth.CachedModelBackend']
+# Столько же может действовать блокировка пользователя через
+# QuerySet.update(), минуя сигналы, см. CachedModelBackend.
+AUTH_USER_CACHE_TIMEOUT = 60
 
 AUTH_PASSWORD_VALIDATORS = []
 
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'sql': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'yanews.sql': {
+            'handlers': ['sql'],
+            'level': 'INFO',
+        },
+    },
+}
+
+SLOW_QUERY_LOG = False
+SLOW_QUERY_THRESHOLD_MS = 100
+
+
 LANGUAGE_CODE = 'ru'
 
 TIME_ZONE = 'Europe/Moscow'
@@ -73,6 +162,11 @@ USE_L10N = True
 USE_TZ = True
 
 STATIC_URL = '/static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+
+# Подключать Bootstrap из своей статики, а не из CDN,
+# см. news.templatetags.assets.
+BOOTSTRAP_VENDORED = False
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -80,3 +174,23 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_NEWS_PAGE = 50
+
+NEWS_SEARCH_RESULTS = 20
+
+NEWS_ASYNC_WORKERS = 8
+
+# Файл со словарём запрещённых слов, по слову в строке.
+# Если не задан, используется news.forms.BAD_WORDS.
+BAD_WORDS_FILE = None
+
+NEWS_THREAD_CACHE_TIMEOUT = 60 * 60
+
+# Кеш страниц для анонимных пользователей, см. news.cache.cached_page:
+# сколько секунд страница свежая, сколько ещё её можно отдавать
+# устаревшей, пока она перерисовывается, и сколько ждать рендеринга
+# в другом запросе.
+NEWS_PAGE_CACHE_TIMEOUT = 60
+NEWS_PAGE_CACHE_STALE = 10 * 60
+NEWS_PAGE_CACHE_LOCK_TIMEOUT = 5
@@ -0,0 +1,44 @@
+"""
+Настройки для продакшена.
+
+Шаблоны компилируются один раз и берутся из кеша загрузчика,
+статика собирается collectstatic с хешами в именах и gzip-копиями
+и отдаётся StaticFilesMiddleware с кешированием на год. Bootstrap
+по умолчанию загружается из CDN: в репозитории его нет. Чтобы отдавать
+свою копию, скачайте её командой vendor_static при сборке и задайте
+DJANGO_BOOTSTRAP_VENDORED=1; без файла manage.py check выдаст
+предупреждение.
+"""
+import os
+
+from .settings import *  # noqa: F401, F403
+from .settings import BASE_DIR, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1'
+).split(',')
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'debug': False,
+        'loaders': [(
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+
+MIDDLEWARE = ['yanews.middleware.StaticFilesMiddleware', *MIDDLEWARE]
+
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_STORAGE = 'yanews.storage.CompressedManifestStaticFilesStorage'
+
+BOOTSTRAP_VENDORED = os.environ.get('DJANGO_BOOTSTRAP_VENDORED') == '1'
@@ -0,0 +1,32 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хешем содержимого в имени и заранее сжатыми копиями.
+
+    Рядом с каждым текстовым файлом с хешем в имени кладётся
+    file.gz, если сжатие экономит хотя бы десятую часть размера.
+    Отдаёт такие файлы yanews.middleware.StaticFilesMiddleware.
+    """
+
+    compress_extensions = ('.css', '.js', '.svg', '.map', '.json', '.txt')
+    min_saving = 0.1
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if name.endswith(self.compress_extensions):
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as source:
+            data = source.read()
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) <= len(data) * (1 - self.min_saving):
+            with open(self.path(name) + '.gz', 'wb') as target:
+                target.write(compressed)
@@ -0,0 +1,8 @@
+"""
+Нагрузочные замеры проекта YaNote.
+
+Запускаются из папки ya_note, например:
+python -m benchmarks.notes_list
+Каждый замер работает на отдельной временной базе SQLite
+и не трогает db.sqlite3 проекта.
+"""
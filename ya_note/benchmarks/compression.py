@@ -0,0 +1,117 @@
+"""Размер базы и время чтения заметок до и после сжатия текста."""
+import os
+import random
+import sysconfig
+import time
+from importlib import import_module
+from pathlib import Path
+from types import SimpleNamespace
+
+from benchmarks.utils import make_parser, measure, report, setup_django
+
+
+def load_documents():
+    """Исходники стандартной библиотеки как «вставленные документы»."""
+    stdlib = Path(sysconfig.get_paths()['stdlib'])
+    return [
+        path.read_text(encoding='utf-8', errors='replace')
+        for path in sorted(stdlib.glob('*.py'))
+    ]
+
+
+def make_corpus(rows, documents, rnd):
+    """Большинство заметок короткие, каждая пятая — кусок документа."""
+    for number in range(rows):
+        document = rnd.choice(documents)
+        if rnd.random() < 0.8:
+            size = rnd.randint(50, 800)
+        else:
+            size = min(len(document), rnd.randint(2_000, 100_000))
+        start = rnd.randint(0, max(len(document) - size, 0))
+        yield f'Заметка {number}', document[start:start + size]
+
+
+def fill(author, rows):
+    """
+    Заполняет заметки несжатым текстом, как до миграции.
+
+    Индекс поиска заполняется тем же, что и у сохранённых заметок,
+    иначе размер базы не учитывал бы его.
+    """
+    from django.db import connection, transaction
+    from django.utils import timezone
+    rnd = random.Random(0)
+    documents = load_documents()
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO notes_note '
+            '(title, text, slug, author_id, created, modified) '
+            'VALUES (%s, %s, %s, %s, %s, %s)',
+            [
+                (title, text, f'note-{number}', author.id, now, now)
+                for number, (title, text) in enumerate(
+                    make_corpus(rows, documents, rnd)
+                )
+            ],
+        )
+        cursor.execute(
+            "INSERT INTO notes_note_fts(rowid, author, title, text) "
+            "SELECT id, 'u' || author_id, title, text FROM notes_note"
+        )
+
+
+def database_size(db_path):
+    from django.db import connection
+    with connection.cursor() as cursor:
+        cursor.execute('VACUUM')
+    return os.path.getsize(db_path) / 1024 / 1024
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    args = parser.parse_args()
+    db_path = setup_django(args.db)
+    from django.apps import apps
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from notes.models import Note
+
+    author = get_user_model().objects.create(username='heavy')
+    fill(author, args.rows)
+    ids = list(Note.objects.values_list('id', flat=True))
+    rnd = random.Random(1)
+    sample = rnd.sample(ids, min(200, len(ids)))
+    migration = import_module('notes.migrations.0004_compress_note_text')
+
+    def read_detail():
+        for note_id in sample:
+            Note.objects.get(pk=note_id).text
+
+    def read_without_text():
+        for note_id in sample:
+            Note.objects.get(pk=note_id).title
+
+    def read_list():
+        list(Note.objects.filter(author=author).only('id', 'slug', 'title'))
+
+    for stage in ('без сжатия', 'со сжатием'):
+        if stage == 'со сжатием':
+            start = time.perf_counter()
+            migration.compress_texts(
+                apps, SimpleNamespace(connection=connection)
+            )
+            print(f'Миграция: {time.perf_counter() - start:.1f} с')
+        print(f'{stage}: база {database_size(db_path):.1f} МБ')
+        report(f'{stage}: 200 заметок с текстом', measure(read_detail, 20))
+        report(
+            f'{stage}: 200 заметок без текста',
+            measure(read_without_text, 20),
+        )
+        report(f'{stage}: список', measure(read_list, 20))
+
+
+if __name__ == '__main__':
+    main()
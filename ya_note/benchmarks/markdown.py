@@ -0,0 +1,47 @@
+"""Markdown заметки: рендер при каждом чтении против кеша по хешу текста."""
+import random
+
+from benchmarks.utils import make_parser, measure, report, setup_django
+
+PARAGRAPH = (
+    '## Раздел {number}\n\n'
+    'Обычный текст с **выделением**, *курсивом* и '
+    '[ссылкой](https://example.com/{number}).\n\n'
+    '- пункт списка\n- ещё пункт с `кодом`\n\n'
+    '| Колонка | Значение |\n|---|---|\n| a | {number} |\n\n'
+    '```\nprint({number})\n```\n\n'
+)
+
+
+def make_text(size, rnd):
+    parts = []
+    while sum(map(len, parts)) < size:
+        parts.append(PARAGRAPH.format(number=rnd.randint(0, 10 ** 6)))
+    return ''.join(parts)[:size]
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+',
+        default=[1_000, 10_000, 100_000, 1_000_000],
+        help='Размер текста заметки в символах.',
+    )
+    args = parser.parse_args()
+    setup_django(args.db)
+    from notes.rendering import render_markdown, render_note_text
+
+    rnd = random.Random(0)
+    for size in args.sizes:
+        text = make_text(size, rnd)
+        repeat = 20 if size <= 100_000 else 5
+        report(f'{size}: рендер при чтении', measure(
+            lambda: render_markdown(text), repeat
+        ))
+        report(f'{size}: из кеша', measure(
+            lambda: render_note_text(text), repeat
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Список заметок: постраничный без текста против полного списка."""
+import time
+
+from benchmarks.utils import make_parser, measure, report, setup_django
+
+TEXT = 'Текст заметки. ' * 30
+
+
+def fill(author, rows):
+    """Дополняет заметки автора до rows штук."""
+    from django.db import connection, transaction
+    from django.utils import timezone
+
+    from notes.models import Note
+    existing = Note.objects.filter(author=author).count()
+    start = time.perf_counter()
+    now = timezone.now()
+    batch = 10_000
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(existing, rows, batch):
+            cursor.executemany(
+                'INSERT INTO notes_note '
+                '(title, text, slug, author_id, created, modified) '
+                'VALUES (%s, %s, %s, %s, %s, %s)',
+                [
+                    (
+                        f'Заметка {number}', TEXT, f'note-{number}',
+                        author.id, now, now,
+                    )
+                    for number in range(offset, min(offset + batch, rows))
+                ],
+            )
+    print(f'Заполнено {rows} заметок за {time.perf_counter() - start:.1f} с')
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+',
+        default=[10_000, 100_000, 1_000_000],
+        help='Число заметок у пользователя.',
+    )
+    parser.add_argument(
+        '--full-limit', type=int, default=100_000,
+        help='Наибольший размер, на котором замеряется весь список.',
+    )
+    args = parser.parse_args()
+    setup_django(args.db)
+    from django.contrib.auth import get_user_model
+    from django.test import RequestFactory
+    from django.views import generic
+
+    from notes.models import Note
+    from notes.views import NoteBase, NotesList
+
+    class FullNotesList(NoteBase, generic.ListView):
+        """Прежний список: все заметки со всеми полями."""
+        template_name = 'notes/list.html'
+
+    user_model = get_user_model()
+    author, _ = user_model.objects.get_or_create(username='heavy')
+    user_model.objects.get_or_create(username='other')
+    factory = RequestFactory()
+
+    def get(view, **params):
+        request = factory.get('/notes/', params)
+        request.user = author
+        return lambda: view(request).render()
+
+    for rows in sorted(args.sizes):
+        fill(author, rows)
+        last_id = Note.objects.filter(author=author).order_by('-id')[
+            100:101
+        ].get().id
+        report(f'{rows}: первая страница', measure(
+            get(NotesList.as_view())
+        ))
+        report(f'{rows}: последняя страница', measure(
+            get(NotesList.as_view(), after=last_id)
+        ))
+        if rows <= args.full_limit:
+            report(f'{rows}: весь список', measure(
+                get(FullNotesList.as_view()), repeat=3
+            ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Запросы к базе и время запроса списка заметок: сессии в базе и в кеше."""
+from benchmarks.utils import make_parser, measure, report, setup_django
+
+PROFILES = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend'
+        ],
+    },
+    'cached': {},
+}
+
+
+def main():
+    parser = make_parser(__doc__)
+    args = parser.parse_args()
+    setup_django(args.db)
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+    from django.urls import reverse
+
+    from notes.models import Note
+    author, _ = get_user_model().objects.get_or_create(username='sessions')
+    if not Note.objects.filter(author=author).exists():
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {number}', text='Текст', author=author,
+                 slug=f'sessions-{number}')
+            for number in range(100)
+        )
+    url = reverse('notes:list')
+    for name, overrides in PROFILES.items():
+        with override_settings(**overrides):
+            client = Client()
+            client.force_login(author)
+            client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                client.get(url)
+            sql = [query['sql'] for query in queries]
+            stats = measure(lambda: client.get(url), repeat=200)
+            stats['queries'] = len(sql)
+            report(name, stats)
+            for query in sql:
+                print(f'    {query[:70]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Транслитерация заголовков: pytils против notes.slugs.slugify."""
+import random
+
+from benchmarks.utils import make_parser, measure, report
+
+WORDS = (
+    'Список', 'покупок', 'на', 'неделю', 'Встреча', 'с', 'командой',
+    'Идеи', 'для', 'отпуска', 'Чтение', '«Война', 'и', 'мир»', '—',
+    'Заметка', '№', '42', 'Ёлка', 'Щука', 'Журнал', 'Q&A',
+)
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument('--titles', type=int, default=10_000)
+    args = parser.parse_args()
+    from pytils.translit import slugify as pytils_slugify
+
+    from notes.slugs import slugify
+
+    rnd = random.Random(0)
+    titles = [
+        ' '.join(rnd.choices(WORDS, k=rnd.randint(2, 8)))
+        for _ in range(args.titles)
+    ]
+
+    def run_pytils():
+        for title in titles:
+            pytils_slugify(title)
+
+    def run_cold():
+        slugify.cache_clear()
+        for title in titles:
+            slugify(title)
+
+    def run_cached():
+        for title in titles[:100]:
+            slugify(title)
+
+    report('pytils, на заголовок', per_title(
+        measure(run_pytils, repeat=5), len(titles)
+    ))
+    report('без кэша, на заголовок', per_title(
+        measure(run_cold, repeat=5), len(titles)
+    ))
+    report('из кэша, на заголовок', per_title(
+        measure(run_cached, repeat=50), 100
+    ))
+
+
+def per_title(stats, count):
+    """Время на один заголовок в микросекундах."""
+    return {
+        key.replace('_ms', '_us'): value * 1000 / count
+        for key, value in stats.items() if key.endswith('_ms')
+    }
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Память и время выгрузки и загрузки заметок в зависимости от их числа."""
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+from benchmarks.notes_list import fill
+from benchmarks.utils import make_parser, setup_django
+
+
+def traced(func):
+    """Время в секундах и пик выделенной памяти в килобайтах."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def main():
+    parser = make_parser(__doc__)
+    parser.add_argument(
+        '--sizes', type=int, nargs='+', default=[10, 10_000, 100_000],
+        help='Число заметок у пользователя.',
+    )
+    args = parser.parse_args()
+    setup_django(args.db)
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test import RequestFactory
+
+    from notes.models import Note
+    from notes.views import NotesExport
+
+    user_model = get_user_model()
+    author, _ = user_model.objects.get_or_create(username='heavy')
+    factory = RequestFactory()
+    path = Path(tempfile.mkdtemp()) / 'notes.jsonl'
+
+    def export():
+        request = factory.get('/export/')
+        request.user = author
+        with open(path, 'wb') as file:
+            for chunk in NotesExport.as_view()(request).streaming_content:
+                file.write(chunk)
+
+    for rows in sorted(args.sizes):
+        fill(author, rows)
+        elapsed, peak = traced(export)
+        print(f'{rows}: выгрузка {elapsed:.2f} с, пик {peak:.0f} КБ')
+        # Заметки загружаются обратно тому же автору.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'DELETE FROM notes_note WHERE author_id = %s', (author.id,)
+            )
+        elapsed, peak = traced(lambda: call_command(
+            'import_notes', author.username, str(path),
+            stdout=StringIO(), stderr=StringIO(),
+        ))
+        assert Note.objects.filter(author=author).count() == rows
+        print(f'{rows}: загрузка {elapsed:.2f} с, пик {peak:.0f} КБ')
+
+
+if __name__ == '__main__':
+    main()
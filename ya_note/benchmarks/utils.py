@@ -0,0 +1,60 @@
+import argparse
+import math
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def make_parser(description):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--db', help='Файл базы; заполненная база используется повторно.'
+    )
+    return parser
+
+
+def setup_django(db_path=None, settings_module='yanote.settings'):
+    """Настраивает Django на отдельную базу и применяет миграции."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    from django.conf import settings
+    if db_path is None:
+        db_path = Path(tempfile.mkdtemp()) / 'bench.sqlite3'
+    settings.DATABASES['default']['NAME'] = Path(db_path)
+    settings.CACHES['sessions']['LOCATION'] = Path(db_path).parent / 'sessions'
+    settings.DEBUG = False
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return db_path
+
+
+def measure(func, repeat=20):
+    """
+    Медиана и 95-й перцентиль времени вызова func в миллисекундах
+    и пик выделенной памяти в килобайтах.
+    """
+    func()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'median_ms': statistics.median(timings),
+        'p95_ms': timings[math.ceil(len(timings) * 0.95) - 1],
+        'peak_kb': peak / 1024,
+    }
+
+
+def report(name, stats):
+    values = ', '.join(f'{key}={value:.3f}' for key, value in stats.items())
+    print(f'{name:<40} {values}')
@@ -1,5 +1,19 @@
 from django.contrib import admin
 
-from .models import Note
+from .models import DeletedNote, Note
+from .signals import invalidate_notes_cache
 
-admin.site.register(Note)
+
+@admin.register(Note)
+class NoteAdmin(admin.ModelAdmin):
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Заметка ушла другому автору: кеш прежнего тоже устарел,
+        # а его клиенты должны удалить заметку у себя.
+        if change and 'author' in form.changed_data:
+            invalidate_notes_cache(form.initial['author'])
+            DeletedNote.objects.create(
+                note_id=obj.pk, slug=obj.slug,
+                author_id=form.initial['author'],
+            )
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .templatetags import assets  # noqa: F401
@@ -0,0 +1,119 @@
+import atexit
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+VERSION_KEY = 'notes:version:{author_id}'
+LIST_KEY = 'notes:list:{author_id}:{version}:{after}'
+NOTE_KEY = 'notes:note:{author_id}:{version}:{slug}'
+HITS_KEY = 'notes:cache-stats:hits'
+MISSES_KEY = 'notes:cache-stats:misses'
+# Как часто счётчики процесса добавляются к общим, в секундах.
+STATS_FLUSH_INTERVAL = 1
+
+_MISSING = object()
+
+
+_pending = Counter()
+_pending_lock = threading.Lock()
+_flushed = time.monotonic()
+
+
+def _count(key):
+    """Учитывает попадание или промах в памяти процесса."""
+    with _pending_lock:
+        _pending[key] += 1
+        if time.monotonic() - _flushed < STATS_FLUSH_INTERVAL:
+            return
+    flush_stats()
+
+
+def flush_stats():
+    """
+    Добавляет счётчики процесса к общим счётчикам в кеше shared.
+
+    Запись в файловый кеш на каждый запрос стоила бы дороже самого
+    попадания, поэтому счётчики копятся в памяти и сбрасываются не
+    чаще раза в STATS_FLUSH_INTERVAL секунд и при выходе.
+    """
+    global _pending, _flushed
+    with _pending_lock:
+        pending, _pending = _pending, Counter()
+        _flushed = time.monotonic()
+    if not pending:
+        return
+    shared = caches['shared']
+    for key, count in pending.items():
+        if not shared.add(key, count, None):
+            shared.incr(key, count)
+
+
+atexit.register(flush_stats)
+
+
+def get_notes_version(author_id):
+    """
+    Версия закешированных заметок автора.
+
+    Хранится в общем для всех процессов кеше shared, чтобы сброс
+    из одного процесса или из import_notes видели остальные.
+    Начальное значение берётся из текущего времени: если ключ версии
+    вытеснен из кеша, новая версия не совпадёт со старыми значениями.
+    """
+    shared = caches['shared']
+    key = VERSION_KEY.format(author_id=author_id)
+    version = shared.get(key)
+    if version is None:
+        shared.add(key, time.time_ns(), None)
+        version = shared.get(key)
+    return version
+
+
+def bump_notes_version(author_id):
+    """
+    Инвалидирует все закешированные страницы заметок автора.
+
+    Новая версия — текущее время: в файловом кеше incr не атомарен.
+    """
+    caches['shared'].set(
+        VERSION_KEY.format(author_id=author_id), time.time_ns(), None
+    )
+
+
+def cache_stats():
+    """Попадания и промахи всех процессов."""
+    flush_stats()
+    shared = caches['shared']
+    return {
+        'hits': shared.get(HITS_KEY, 0),
+        'misses': shared.get(MISSES_KEY, 0),
+    }
+
+
+def get_or_set(key, default):
+    """Значение из кеша; при промахе вычисляется default() и кешируется."""
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _count(HITS_KEY)
+        return value
+    _count(MISSES_KEY)
+    value = default()
+    cache.set(key, value, settings.NOTES_CACHE_TIMEOUT)
+    return value
+
+
+def list_key(author_id, after):
+    return LIST_KEY.format(
+        author_id=author_id, version=get_notes_version(author_id),
+        after=after,
+    )
+
+
+def note_key(author_id, slug):
+    return NOTE_KEY.format(
+        author_id=author_id, version=get_notes_version(author_id),
+        slug=slug,
+    )
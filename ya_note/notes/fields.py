@@ -0,0 +1,95 @@
+import zlib
+
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+
+class CompressedText:
+    """
+    Сжатый текст, ещё не распакованный.
+
+    Так значение поля CompressedTextField приходит из базы;
+    распаковка происходит при первом обращении к атрибуту модели.
+    В values() и values_list() объект попадает как есть,
+    текст из него даёт str().
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return zlib.decompress(self.data).decode()
+
+    def __eq__(self, other):
+        if isinstance(other, CompressedText):
+            return self.data == other.data
+        return str(self) == other
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __reduce__(self):
+        return CompressedText, (self.data,)
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    """Распаковывает текст при первом чтении атрибута."""
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if isinstance(value, CompressedText):
+            value = str(value)
+            instance.__dict__[self.field.attname] = value
+        return value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+
+class CompressedTextField(models.TextField):
+    """
+    Текстовое поле, большие значения которого хранятся сжатыми zlib.
+
+    Тексты от threshold байт в UTF-8 сохраняются в тот же столбец как
+    BLOB, если сжатие их уменьшает; короткие остаются обычным текстом.
+    Поиск по подстроке (contains и подобные) сжатые значения
+    не находит.
+    """
+
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, threshold=1024, **kwargs):
+        self.threshold = threshold
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.threshold != 1024:
+            kwargs['threshold'] = self.threshold
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if isinstance(value, bytes):
+            return CompressedText(value)
+        return value
+
+    def to_python(self, value):
+        if isinstance(value, CompressedText):
+            return str(value)
+        return super().to_python(value)
+
+    def compress(self, value):
+        """Сжатое значение для записи в базу или исходный текст."""
+        encoded = value.encode()
+        if len(encoded) < self.threshold:
+            return value
+        data = zlib.compress(encoded)
+        return data if len(data) < len(encoded) else value
+
+    def get_db_prep_save(self, value, connection):
+        value = super().get_db_prep_save(value, connection)
+        if value is None:
+            return value
+        return self.compress(value)
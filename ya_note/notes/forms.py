@@ -1,7 +1,7 @@
-from pytils.translit import slugify
-
 from django import forms
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
 
 from .models import Note
 
@@ -16,14 +16,44 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
+        """
+        Обрабатывает случай, если slug не уникален.
+
+        Пустой slug не проверяем: свободный вариант из заголовка
+        подберёт Note.save.
+        """
+        slug = self.cleaned_data.get('slug')
         if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
+            return slug
         if Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+
+class SlugListField(forms.Field):
+    """Список slug из повторяющегося параметра запроса."""
+
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        # Повторы не нужны, порядок сохраняем для ответа.
+        return list(dict.fromkeys(value or ()))
+
+    def validate(self, value):
+        super().validate(value)
+        if len(value) > settings.NOTES_BULK_LIMIT:
+            raise ValidationError(
+                f'За один запрос можно обработать не больше '
+                f'{settings.NOTES_BULK_LIMIT} заметок.'
+            )
+        for slug in value:
+            validate_slug(slug)
+
+
+class NotesBulkForm(forms.Form):
+    """Действие над несколькими заметками сразу."""
+
+    action = forms.ChoiceField(choices=(('delete', 'Удалить'),))
+    slug = SlugListField()
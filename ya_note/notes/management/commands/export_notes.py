@@ -0,0 +1,29 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.transfer import export_notes
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка заметок пользователя в формате JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--output', default='-', help='Файл или - для stdout.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = get_user_model().objects.get(
+                username=options['username']
+            )
+        except get_user_model().DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        path = options['output']
+        if path == '-':
+            for line in export_notes(author):
+                self.stdout.write(line, ending='')
+            return
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.writelines(export_notes(author))
@@ -0,0 +1,130 @@
+import json
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from notes.cache import bump_notes_version
+from notes.forms import WARNING
+from notes.models import Note
+from notes.search import index_notes
+
+
+class Command(BaseCommand):
+    help = (
+        'Загрузка заметок пользователя из JSON Lines (формат export_notes). '
+        'Заметки с уже занятым slug пропускаются, заметкам без slug он '
+        'подбирается по заголовку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path', help='Файл с заметками или - для stdin.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            self.author = get_user_model().objects.get(
+                username=options['username']
+            )
+        except get_user_model().DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        batch_size = options['batch_size']
+        path = options['path']
+        stream = (
+            sys.stdin if path == '-' else open(path, encoding='utf-8')
+        )
+        self.created = self.skipped = self.invalid = 0
+        try:
+            batch = []
+            for number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                note = self.build_note(number, line)
+                if note is not None:
+                    batch.append(note)
+                if len(batch) >= batch_size:
+                    self.save_batch(batch)
+                    batch = []
+            if batch:
+                self.save_batch(batch)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        if self.created:
+            bump_notes_version(self.author.pk)
+        self.stdout.write(
+            f'Создано: {self.created}, пропущено: {self.skipped}, '
+            f'с ошибками: {self.invalid}.'
+        )
+
+    def build_note(self, number, line):
+        try:
+            fields = json.loads(line)
+            if not isinstance(fields, dict):
+                raise ValidationError('Запись должна быть объектом.')
+            note = Note(
+                title=fields.get('title', ''),
+                text=fields.get('text', ''),
+                slug=fields.get('slug') or '',
+                author=self.author,
+            )
+            note.clean_fields(exclude=('author',))
+        except (json.JSONDecodeError, ValidationError) as error:
+            self.invalid += 1
+            self.stderr.write(f'Строка {number}: {error}')
+            return None
+        return note
+
+    def skip(self, note):
+        self.skipped += 1
+        self.stderr.write(note.slug + WARNING)
+
+    def save_batch(self, batch):
+        """
+        Сохраняет пачку заметок одной транзакцией.
+
+        Как и в NoteForm, занятый slug не заменяется другим: такая
+        заметка пропускается. Заметки без slug сохраняются по одной,
+        чтобы Note.save подобрал свободный slug.
+        """
+        with transaction.atomic():
+            taken = set(Note.objects.filter(
+                slug__in=[note.slug for note in batch if note.slug]
+            ).values_list('slug', flat=True))
+            new, unnamed = [], []
+            for note in batch:
+                if not note.slug:
+                    unnamed.append(note)
+                elif note.slug in taken:
+                    self.skip(note)
+                else:
+                    taken.add(note.slug)
+                    new.append(note)
+            self.bulk_create(new)
+            for note in unnamed:
+                note.save()
+            self.created += len(unnamed)
+
+    def bulk_create(self, notes):
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(notes)
+        except IntegrityError:
+            # slug успел занять параллельный запрос: сохраняем по одной.
+            for note in notes:
+                try:
+                    with transaction.atomic():
+                        note.save()
+                    self.created += 1
+                except IntegrityError:
+                    self.skip(note)
+            return
+        self.created += len(notes)
+        # bulk_create не вызывает post_save, а на SQLite и не возвращает
+        # id, поэтому заметки для индекса поиска читаются заново.
+        index_notes(list(Note.objects.filter(
+            slug__in=[note.slug for note in notes]
+        )))
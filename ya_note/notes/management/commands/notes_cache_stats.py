@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from notes.cache import cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кеша страниц заметок.'
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {ratio:.1%}'
+        )
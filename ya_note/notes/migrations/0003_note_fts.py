@@ -0,0 +1,36 @@
+# Generated by Django 3.2.15 on 2026-10-18 19:05
+
+from django.db import migrations
+
+# Полнотекстовый индекс FTS5 по заметкам. Индекс хранит собственную
+# копию заголовка и текста и обновляется из Python (notes.signals),
+# а не триггерами. Столбец author содержит токен автора, чтобы поиск
+# пользователя выбирал только его заметки прямо из индекса.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        author, title, text,
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    INSERT INTO notes_note_fts(rowid, author, title, text)
+    SELECT id, 'u' || author_id, title, text FROM notes_note
+    """,
+]
+
+DROP_FTS = [
+    'DROP TABLE notes_note_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_FTS, DROP_FTS),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:54
+
+import zlib
+
+from django.db import migrations
+
+import notes.fields
+
+BATCH_SIZE = 1000
+
+
+def convert_rows(apps, schema_editor, stored_type, convert):
+    """Переписывает пачками значения text, хранящиеся как stored_type."""
+    connection = schema_editor.connection
+    last_id = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, text FROM notes_note '
+                'WHERE id > %s AND typeof(text) = %s '
+                'ORDER BY id LIMIT %s',
+                (last_id, stored_type, BATCH_SIZE),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            cursor.executemany(
+                'UPDATE notes_note SET text = %s WHERE id = %s',
+                [(convert(text), note_id) for note_id, text in rows],
+            )
+        last_id = rows[-1][0]
+
+
+def compress_texts(apps, schema_editor):
+    field = apps.get_model('notes', 'Note')._meta.get_field('text')
+    convert_rows(apps, schema_editor, 'text', field.compress)
+
+
+def decompress_texts(apps, schema_editor):
+    convert_rows(
+        apps, schema_editor, 'blob',
+        lambda data: zlib.decompress(data).decode(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_fts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='note',
+            name='text',
+            field=notes.fields.CompressedTextField(help_text='Добавьте подробностей', verbose_name='Текст'),
+        ),
+        migrations.RunPython(compress_texts, decompress_texts),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.15 on 2026-10-18 18:57
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0004_compress_note_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedNote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_id', models.BigIntegerField(verbose_name='ID заметки')),
+                ('slug', models.SlugField(db_index=False, max_length=100, verbose_name='Адрес заметки')),
+                ('deleted', models.DateTimeField(auto_now_add=True, verbose_name='Удалена')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Создана'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='note',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, verbose_name='Изменена'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['author', 'modified'], name='note_author_modified_idx'),
+        ),
+        migrations.AddField(
+            model_name='deletednote',
+            name='author',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='deletednote',
+            index=models.Index(fields=['author', 'deleted', 'note_id'], name='deletednote_author_deleted_idx'),
+        ),
+    ]
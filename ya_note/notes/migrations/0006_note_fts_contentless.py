@@ -0,0 +1,76 @@
+# Generated by Django 3.2.15 on 2026-10-18 21:10
+
+from django.db import migrations
+
+import notes.fields
+
+BATCH_SIZE = 1000
+
+# Индекс без собственной копии текста (content=''): тексты заметок
+# хранятся сжатыми (см. 0004_compress_note_text), а копия в индексе
+# оставалась бы несжатой и занимала больше места, чем сами заметки.
+# Удаление из такого индекса требует прежних значений столбцов, поэтому
+# notes.search читает их из notes_note до изменения заметки.
+CREATE_CONTENTLESS_FTS = """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        author, title, text,
+        content='',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+CREATE_FTS = """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        author, title, text,
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+DROP_FTS = 'DROP TABLE notes_note_fts'
+
+
+def fill_index(apps, schema_editor):
+    """Заполняет индекс пачками, распаковывая тексты в Python."""
+    connection = schema_editor.connection
+    last_id = 0
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT id, author_id, title, text FROM notes_note '
+                'WHERE id > %s ORDER BY id LIMIT %s',
+                (last_id, BATCH_SIZE),
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return
+            cursor.executemany(
+                'INSERT INTO notes_note_fts(rowid, author, title, text) '
+                'VALUES (%s, %s, %s, %s)',
+                [
+                    (
+                        note_id,
+                        f'u{author_id}',
+                        title,
+                        str(notes.fields.CompressedText(text))
+                        if isinstance(text, bytes) else text,
+                    )
+                    for note_id, author_id, title, text in rows
+                ],
+            )
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0005_note_modified_deletednote'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, fill_index),
+        migrations.RunSQL(DROP_FTS, CREATE_FTS),
+        migrations.RunSQL(CREATE_CONTENTLESS_FTS, DROP_FTS),
+        migrations.RunPython(fill_index, migrations.RunPython.noop),
+    ]
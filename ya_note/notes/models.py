@@ -1,7 +1,8 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .fields import CompressedTextField
+from .slugs import MAX_SLUG_ATTEMPTS, next_free_slug, slugify
 
 
 class Note(models.Model):
@@ -11,7 +12,7 @@ class Note(models.Model):
         default='Название заметки',
         help_text='Дайте короткое название заметке'
     )
-    text = models.TextField(
+    text = CompressedTextField(
         'Текст',
         help_text='Добавьте подробностей'
     )
@@ -26,13 +27,77 @@ class Note(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        # Поиск по автору обслуживает составной индекс note_author_id_idx.
+        db_index=False,
     )
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    modified = models.DateTimeField('Изменена', auto_now=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+            models.Index(
+                fields=('author', 'modified'),
+                name='note_author_modified_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Пустой slug формируется из заголовка с числовым суффиксом.
+
+        Предварительной проверке свободного slug не доверяем:
+        если его успел занять параллельный запрос, база вернёт
+        IntegrityError, и мы выберем следующий суффикс.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = slugify(self.title)[:max_slug_length]
+        others = Note.objects.exclude(pk=self.pk)
+        taken = None
+        for attempt in range(MAX_SLUG_ATTEMPTS):
+            self.slug = next_free_slug(
+                others, base, max_slug_length, after=taken
+            )
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                taken, self.slug = self.slug, ''
+                if attempt == MAX_SLUG_ATTEMPTS - 1:
+                    raise
+
+
+class DeletedNote(models.Model):
+    """
+    Отметка об удалённой заметке для синхронизации клиентов.
+
+    Внешний ключ на автора без ограничения в базе: при удалении
+    пользователя отметки о его заметках создаются уже во время
+    каскадного удаления и остаются недоступными никому.
+    """
+
+    note_id = models.BigIntegerField('ID заметки')
+    slug = models.SlugField('Адрес заметки', max_length=100, db_index=False)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_constraint=False,
+        db_index=False,
+    )
+    deleted = models.DateTimeField('Удалена', auto_now_add=True)
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('author', 'deleted', 'note_id'),
+                name='deletednote_author_deleted_idx',
+            ),
+        )
+
+    def __str__(self):
+        return self.slug
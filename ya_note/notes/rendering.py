@@ -0,0 +1,113 @@
+import hashlib
+import html
+import re
+import threading
+from urllib.parse import urlsplit
+
+import markdown
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.html import linebreaks
+from django.utils.safestring import mark_safe
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+# Меняется при смене набора расширений, чтобы не отдавать старый HTML.
+RENDERER_VERSION = 2
+MARKDOWN_KEY = 'notes:markdown:{version}:{digest}'
+EXTENSIONS = ('fenced_code', 'tables', 'sane_lists')
+SAFE_SCHEMES = frozenset(('', 'http', 'https', 'mailto'))
+# Пробелы и управляющие символы браузер в адресе пропускает.
+IGNORED_URL_CHARS = re.compile(r'[\s\x00-\x1f\x7f-\x9f]+')
+
+_local = threading.local()
+
+
+def is_safe_url(url):
+    """
+    Схема адреса из списка разрешённых.
+
+    Адрес проверяется в том виде, в каком его прочитает браузер:
+    с раскрытыми HTML-сущностями и без пробелов и управляющих
+    символов, иначе javascript&#58; прошёл бы как адрес без схемы.
+    """
+    url = IGNORED_URL_CHARS.sub('', html.unescape(url))
+    try:
+        return urlsplit(url).scheme.lower() in SAFE_SCHEMES
+    except ValueError:
+        return False
+
+
+class SafeLinksProcessor(Treeprocessor):
+    """Удаляет ссылки и картинки со схемами вроде javascript:."""
+
+    def run(self, root):
+        for element in root.iter():
+            for attribute in ('href', 'src'):
+                value = element.get(attribute)
+                if value is not None and not is_safe_url(value):
+                    del element.attrib[attribute]
+
+
+class SafeMarkdownExtension(Extension):
+    """
+    Markdown без HTML от пользователя.
+
+    HTML-блоки и теги в тексте выводятся как текст, а не разметка.
+    """
+
+    def extendMarkdown(self, md):  # noqa: N802
+        md.preprocessors.deregister('html_block')
+        md.inlinePatterns.deregister('html')
+        # После обработки строковых элементов (inline, приоритет 20).
+        md.treeprocessors.register(SafeLinksProcessor(md), 'safe_links', 5)
+
+
+def _get_markdown():
+    """
+    Экземпляр Markdown для текущего потока.
+
+    Markdown не потокобезопасен, а создавать его на каждый вызов дорого.
+    """
+    md = getattr(_local, 'markdown', None)
+    if md is None:
+        md = _local.markdown = markdown.Markdown(
+            extensions=[*EXTENSIONS, SafeMarkdownExtension()]
+        )
+    return md
+
+
+def render_markdown(text):
+    """
+    HTML из Markdown без кеша.
+
+    Время рендера растёт быстрее размера текста, поэтому тексты длиннее
+    NOTES_MARKDOWN_MAX_LENGTH показываются как обычный текст.
+    """
+    if len(text) > settings.NOTES_MARKDOWN_MAX_LENGTH:
+        return linebreaks(text, autoescape=True)
+    md = _get_markdown()
+    try:
+        return md.convert(text)
+    finally:
+        md.reset()
+
+
+def render_note_text(text):
+    """
+    HTML текста заметки.
+
+    Результат кешируется по хешу текста в отдельном кеше
+    с ограниченным числом записей: одинаковые тексты рендерятся
+    один раз, а правка заметки просто даёт новый ключ.
+    """
+    cache = caches['markdown']
+    key = MARKDOWN_KEY.format(
+        version=RENDERER_VERSION,
+        digest=hashlib.sha256(text.encode()).hexdigest(),
+    )
+    html = cache.get(key)
+    if html is None:
+        html = render_markdown(text)
+        cache.set(key, html, None)
+    return mark_safe(html)
@@ -0,0 +1,151 @@
+import re
+import unicodedata
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Note
+
+# Индекс не хранит текст заметок (content=''), поэтому snippet()
+# недоступен: фрагмент с совпадениями строится в Python по тексту
+# найденных заметок.
+SEARCH_SQL = """
+    SELECT notes_note.id, notes_note.title, notes_note.slug,
+           notes_note.text
+    FROM notes_note_fts
+    JOIN notes_note ON notes_note.id = notes_note_fts.rowid
+    WHERE notes_note_fts MATCH %s
+    ORDER BY bm25(notes_note_fts, 0.0, 10.0, 1.0)
+    LIMIT %s
+"""
+
+SNIPPET_WORDS = 16
+WORD = re.compile(r'\w+')
+
+
+def author_token(author_id):
+    """Токен автора в индексе: поиск сужается до его заметок по индексу."""
+    return f'u{author_id}'
+
+
+def split_query(query):
+    return WORD.findall(query.lower())
+
+
+def build_match_query(author_id, query):
+    """
+    Переводит пользовательский запрос в выражение FTS5.
+
+    Каждое слово ищется по префиксу в заголовке и тексте, слова
+    объединяются через AND вместе с токеном автора. Кавычки не дают
+    пользователю использовать синтаксис FTS5.
+    """
+    terms = split_query(query)
+    if not terms:
+        return ''
+    words = ' '.join(f'"{term}"*' for term in terms)
+    return f'author:"{author_token(author_id)}" AND {{title text}}:({words})'
+
+
+def index_notes(notes):
+    """
+    Добавляет новые заметки в полнотекстовый индекс.
+
+    Заметки, которые уже есть в индексе, сначала удаляются из него
+    через unindex_notes.
+    """
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO notes_note_fts(rowid, author, title, text) '
+            'VALUES (%s, %s, %s, %s)',
+            [
+                (note.pk, author_token(note.author_id), note.title, note.text)
+                for note in notes
+            ],
+        )
+
+
+def index_note(note):
+    index_notes([note])
+
+
+def unindex_notes(note_ids):
+    """
+    Удаляет заметки из полнотекстового индекса.
+
+    Индексу без копии текста нужно передать проиндексированные
+    значения, поэтому заметки читаются из базы и вызывать функцию
+    нужно до того, как они изменятся или будут удалены.
+    """
+    rows = Note.objects.filter(pk__in=list(note_ids)).values_list(
+        'pk', 'author_id', 'title', 'text'
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            'INSERT INTO notes_note_fts'
+            '(notes_note_fts, rowid, author, title, text) '
+            "VALUES ('delete', %s, %s, %s, %s)",
+            [
+                (note_id, author_token(author_id), title, str(text))
+                for note_id, author_id, title, text in rows
+            ],
+        )
+
+
+def unindex_note(note_id):
+    unindex_notes([note_id])
+
+
+def fold(word):
+    """Слово без регистра и диакритики, как его видит токенизатор."""
+    return ''.join(
+        char for char in unicodedata.normalize('NFD', word.lower())
+        if not unicodedata.combining(char)
+    )
+
+
+def make_snippet(text, terms):
+    """
+    Фрагмент текста вокруг первого совпадения.
+
+    Совпадения, как и в запросе к индексу, ищутся по префиксу слова
+    и выделяются тегом mark, остальной текст экранируется.
+    """
+    prefixes = [fold(term) for term in terms]
+    words = list(WORD.finditer(text))
+
+    def matches(word):
+        return fold(word.group()).startswith(tuple(prefixes))
+
+    first = next(
+        (number for number, word in enumerate(words) if matches(word)), 0
+    )
+    start = max(0, min(first, len(words) - SNIPPET_WORDS))
+    window = words[start:start + SNIPPET_WORDS]
+    if not window:
+        return ''
+    parts = ['…'] if start else []
+    position = window[0].start()
+    for word in window:
+        parts.append(escape(text[position:word.start()]))
+        if matches(word):
+            parts.append(f'<mark>{escape(word.group())}</mark>')
+        else:
+            parts.append(escape(word.group()))
+        position = word.end()
+    if start + SNIPPET_WORDS < len(words):
+        parts.append('…')
+    return mark_safe(''.join(parts))
+
+
+def search_notes(author, query, limit):
+    """Заметки автора, подходящие под запрос, от наиболее релевантной."""
+    match = build_match_query(author.pk, query)
+    if not match:
+        return []
+    terms = split_query(query)
+    results = list(Note.objects.raw(SEARCH_SQL, (match, limit)))
+    for note in results:
+        note.snippet = make_snippet(note.text, terms)
+    return results
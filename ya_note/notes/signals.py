@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_out
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save,
+)
+from django.dispatch import receiver
+
+from yanote.auth import invalidate_user
+
+from .cache import bump_notes_version
+from .models import DeletedNote, Note
+from .search import index_note, unindex_note
+
+_bulk_delete = ContextVar('notes_bulk_delete', default=False)
+
+
+def invalidate_notes_cache(author_id):
+    """
+    Сбрасывает кеш заметок автора сразу и после фиксации транзакции.
+
+    Второй сброс нужен, если между ними другой запрос успел прочитать
+    из базы ещё старые данные и закешировать их под новой версией.
+    """
+    bump_notes_version(author_id)
+    transaction.on_commit(lambda: bump_notes_version(author_id))
+
+
+@contextmanager
+def deleting_in_bulk():
+    """
+    Удаление заметок без обработки каждой в сигналах.
+
+    Индекс поиска, отметки об удалении и кеш вызывающий код
+    обновляет сам, одним запросом на все удалённые заметки.
+    """
+    token = _bulk_delete.set(True)
+    try:
+        yield
+    finally:
+        _bulk_delete.reset(token)
+
+
+@receiver(pre_save, sender=Note)
+@receiver(pre_delete, sender=Note)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Убирает из индекса прежнюю версию заметки, пока она ещё в базе."""
+    if instance.pk is not None and not _bulk_delete.get():
+        unindex_note(instance.pk)
+
+
+@receiver(post_save, sender=Note)
+def update_search_index(sender, instance, **kwargs):
+    index_note(instance)
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def invalidate_author_notes(sender, instance, **kwargs):
+    if not _bulk_delete.get():
+        invalidate_notes_cache(instance.author_id)
+
+
+@receiver(post_delete, sender=Note)
+def leave_tombstone(sender, instance, **kwargs):
+    """Запоминает удаление, чтобы клиенты узнали о нём при синхронизации."""
+    if not _bulk_delete.get():
+        DeletedNote.objects.create(
+            note_id=instance.pk,
+            slug=instance.slug,
+            author_id=instance.author_id,
+        )
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def forget_logged_out_user(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
@@ -0,0 +1,111 @@
+import re
+from functools import lru_cache
+
+from django.db.models import Count, IntegerField, Max, Q
+from django.db.models.functions import Cast, Substr
+from pytils.translit import ALPHABET, TRANSTABLE
+
+# Сколько раз пытаться сохранить заметку, если выбранный slug
+# успел занять параллельный запрос.
+MAX_SLUG_ATTEMPTS = 10
+
+AMPERSAND_RE = re.compile(r'&amp;|&')
+SEPARATORS_RE = re.compile(r'[-\s]+')
+NOT_SLUG_RE = re.compile(r'[^\w\s-]')
+
+
+class _TranslitTable(dict):
+    """
+    Таблица для str.translate, равносильная pytils.translit.slugify.
+
+    Буквы алфавита pytils заменяются латиницей, из замен сразу убраны
+    символы, которые slugify всё равно удаляет. Прочие символы
+    удаляются: для латиницы и кириллицы это записано в таблицу
+    заранее, остальные обрабатывает __missing__, не добавляя их
+    в таблицу, чтобы она не росла от заголовков с редкими символами.
+    """
+
+    PRECOMPUTED = (range(0x250), range(0x400, 0x530))
+
+    def __init__(self):
+        super().__init__(
+            (code, None) for codes in self.PRECOMPUTED for code in codes
+        )
+        for symbol in ALPHABET:
+            if len(symbol) != 1:
+                continue
+            translit = symbol
+            for symbol_in, symbol_out in TRANSTABLE:
+                translit = translit.replace(symbol_in, symbol_out)
+            self[ord(symbol)] = NOT_SLUG_RE.sub('', translit)
+
+    def __missing__(self, code):
+        return None
+
+
+_TRANSLIT_TABLE = _TranslitTable()
+
+
+@lru_cache(maxsize=1024)
+def slugify(title):
+    """
+    То же, что pytils.translit.slugify, но за один проход translate.
+
+    pytils заменяет символы по одному циклом по таблице
+    транслитерации; здесь таблица собрана заранее, а результат
+    для повторяющихся заголовков берётся из кэша.
+    """
+    slug = AMPERSAND_RE.sub(' and ', str(title).lower())
+    slug = SEPARATORS_RE.sub('-', slug)
+    return slug.translate(_TRANSLIT_TABLE)
+
+
+def _taken_suffixes(queryset, base, stem):
+    """
+    Занят ли сам base и наибольший суффикс среди slug вида stem-N.
+
+    Диапазон индекса захватывает и slug вроде stem-2024-plans,
+    поэтому суффикс дополнительно проверяется на одни цифры.
+    """
+    numbered = Q(
+        slug__gt=f'{stem}-',
+        slug__lt=f'{stem}.',
+        slug__regex=rf'^{re.escape(stem)}-[0-9]+$',
+    )
+    return queryset.filter(Q(slug=base) | numbered).aggregate(
+        exact=Count('pk', filter=Q(slug=base)),
+        suffix=Max(Cast(Substr('slug', len(stem) + 2), IntegerField())),
+    )
+
+
+def next_free_slug(queryset, base, max_length, after=None):
+    """
+    Следующий свободный slug вида base, base-2, base-3…
+
+    Занятые варианты выбираются одним запросом по диапазону индекса
+    slug (base и slug от «stem-» до «stem.» с числовым суффиксом),
+    а максимальный суффикс вычисляется агрегатом на стороне базы.
+    stem — base, укороченный так, чтобы с суффиксом уложиться в max_length;
+    когда в суффиксе прибавляется цифра, stem становится короче и
+    занятые суффиксы запрашиваются для него заново.
+
+    Результат не гарантирует уникальность: между проверкой и
+    вставкой slug может занять другой запрос, поэтому вызывающий
+    код повторяет попытку при IntegrityError, передавая в after
+    оказавшийся занятым slug, — тогда следующий вариант будет
+    дальше него.
+    """
+    number = 2
+    if after is not None and after != base:
+        number = int(after.rsplit('-', 1)[1]) + 1
+    stem = base[:max_length - len(f'-{number}')]
+    taken = _taken_suffixes(queryset, base, stem)
+    if not taken['exact'] and after is None:
+        return base
+    while True:
+        number = max(number, (taken['suffix'] or 0) + 1)
+        suffix = f'-{number}'
+        if len(stem) + len(suffix) <= max_length:
+            return stem + suffix
+        stem = base[:max_length - len(suffix)]
+        taken = _taken_suffixes(queryset, base, stem)
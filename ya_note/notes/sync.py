@@ -0,0 +1,104 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from heapq import merge
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DeletedNote, Note
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(moment, note_id):
+    raw = json.dumps([moment.isoformat(), note_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        moment, note_id = json.loads(base64.urlsafe_b64decode(cursor))
+        moment = datetime.fromisoformat(moment)
+        if timezone.is_naive(moment) or not isinstance(note_id, int):
+            raise ValueError
+    except (TypeError, ValueError):
+        raise InvalidCursor('Некорректный курсор синхронизации.')
+    return moment, note_id
+
+
+def _after(moment_field, id_field, cursor):
+    """Условие «строго после курсора» по паре (время, id заметки)."""
+    if cursor is None:
+        return Q()
+    moment, note_id = cursor
+    # Ограничение снизу даёт базе диапазон индекса (author, время).
+    return Q(**{f'{moment_field}__gte': moment}) & (
+        Q(**{f'{moment_field}__gt': moment})
+        | Q(**{moment_field: moment, f'{id_field}__gt': note_id})
+    )
+
+
+def _note_change(note):
+    return note.modified, note.id, {
+        'id': note.id,
+        'slug': note.slug,
+        'title': note.title,
+        'text': note.text,
+        'modified': note.modified.isoformat(),
+        'deleted': False,
+    }
+
+
+def _deleted_change(tombstone):
+    return tombstone.deleted, tombstone.note_id, {
+        'id': tombstone.note_id,
+        'slug': tombstone.slug,
+        'modified': tombstone.deleted.isoformat(),
+        'deleted': True,
+    }
+
+
+def get_changes(author, cursor=None, limit=None):
+    """
+    Заметки автора, изменённые или удалённые после курсора.
+
+    Изменения упорядочены по времени и id заметки и выбираются по
+    индексам (author, modified) и (author, deleted), так что объём
+    работы зависит от числа изменений, а не от числа заметок.
+
+    Время изменения выставляется до фиксации транзакции, поэтому
+    запись может стать видимой позже более новых. Чтобы не потерять
+    её, последняя страница ставит курсор на NOTES_SYNC_SAFETY_WINDOW
+    секунд назад: изменения из этого окна придут клиенту ещё раз,
+    и применять их нужно идемпотентно.
+    """
+    limit = limit or settings.NOTES_SYNC_LIMIT
+    decoded = decode_cursor(cursor) if cursor else None
+    notes = Note.objects.filter(
+        _after('modified', 'id', decoded), author=author
+    ).order_by('modified', 'id')[:limit + 1]
+    tombstones = DeletedNote.objects.filter(
+        _after('deleted', 'note_id', decoded), author=author
+    ).order_by('deleted', 'note_id')[:limit + 1]
+    changes = list(merge(
+        map(_note_change, notes), map(_deleted_change, tombstones),
+        key=lambda change: change[:2],
+    ))
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if has_more:
+        next_cursor = changes[-1][:2]
+    else:
+        # Всё, что видно сейчас, отдано: курсор ставится на начало окна.
+        next_cursor = timezone.now() - timedelta(
+            seconds=settings.NOTES_SYNC_SAFETY_WINDOW
+        ), 0
+    return {
+        'changes': [change[2] for change in changes],
+        'cursor': encode_cursor(*next_cursor),
+        'has_more': has_more,
+    }
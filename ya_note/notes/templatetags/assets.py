@@ -0,0 +1,53 @@
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core import checks
+from django.templatetags.static import static
+from django.utils.html import format_html
+
+BOOTSTRAP_VERSION = '5.0.1'
+BOOTSTRAP_CDN_URL = (
+    f'https://cdn.jsdelivr.net/npm/bootstrap@{BOOTSTRAP_VERSION}'
+    '/dist/css/bootstrap.min.css'
+)
+BOOTSTRAP_INTEGRITY = (
+    'sha384-+0n0xVW2eSR5OomGNYDnhzAbDsOXxcvSN1TPprVMTNDbiYZCxYbOOl7+AMvyTG2x'
+)
+BOOTSTRAP_STATIC_PATH = f'vendor/bootstrap-{BOOTSTRAP_VERSION}.min.css'
+
+register = template.Library()
+
+
+@register.simple_tag
+def bootstrap_css():
+    """
+    Подключение Bootstrap.
+
+    С BOOTSTRAP_VENDORED стили берутся из своей статики (см. команду
+    vendor_static), иначе — из CDN. Если файл в статику не собран,
+    страница тоже ссылается на CDN, а не падает на поиске в манифесте.
+    """
+    href = BOOTSTRAP_CDN_URL
+    if settings.BOOTSTRAP_VENDORED:
+        try:
+            href = static(BOOTSTRAP_STATIC_PATH)
+        except ValueError:
+            pass
+    return format_html(
+        '<link rel="stylesheet" href="{}" integrity="{}" '
+        'crossorigin="anonymous">',
+        href,
+        BOOTSTRAP_INTEGRITY,
+    )
+
+
+@checks.register(checks.Tags.templates)
+def check_vendored_bootstrap(app_configs, **kwargs):
+    if settings.BOOTSTRAP_VENDORED and not finders.find(BOOTSTRAP_STATIC_PATH):
+        return [checks.Warning(
+            f'BOOTSTRAP_VENDORED включён, но {BOOTSTRAP_STATIC_PATH} '
+            'нет в статике: стили будут загружаться из CDN.',
+            hint='Выполните manage.py vendor_static.',
+            id='notes.W001',
+        )]
+    return []
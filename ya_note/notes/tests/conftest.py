@@ -0,0 +1,33 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
+
+from notes.cache import flush_stats
+
+
+@pytest.fixture(scope='session', autouse=True)
+def memory_caches():
+    """
+    Кеши на время тестов хранятся в памяти процесса.
+
+    Файловые кеши сессий и версий общие с сервером: тесты не
+    должны ни читать, ни оставлять в них данные.
+    """
+    with override_settings(CACHES={
+        alias: {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': alias,
+        }
+        for alias in settings.CACHES
+    }):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Каждый тест начинается с пустыми кешами."""
+    # Счётчики, накопленные в процессе, сначала попадают в кеш.
+    flush_stats()
+    for alias in settings.CACHES:
+        caches[alias].clear()
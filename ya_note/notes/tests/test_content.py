@@ -1,8 +1,26 @@
+import json
+from http import HTTPStatus
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from notes.cache import (
+    HITS_KEY,
+    MISSES_KEY,
+    VERSION_KEY,
+    bump_notes_version,
+    cache_stats,
+)
 from notes.models import Note
+from notes.rendering import render_markdown
 from notes.forms import NoteForm
 
 User = get_user_model()
@@ -44,7 +62,7 @@ class TestPagesNote(TestCase):
         """В список заметок одного пользователя не попадают заметки другого."""
         response = self.auth_client.get(self.LIST_URL)
         object_list = response.context['object_list']
-        self.assertEqual(object_list.count(), 0)
+        self.assertEqual(len(object_list), 0)
 
     def test_pages_contains_form(self):
         """На страницы создания и редактирования заметки передаются формы."""
@@ -57,3 +75,315 @@ class TestPagesNote(TestCase):
                 response = self.author_client.get(url)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+
+@override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+class TestNotesListPages(TestCase):
+    LIST_URL = reverse('notes:list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.notes = [
+            Note.objects.create(
+                title=f'Заметка {index}', text='Текст', author=cls.author
+            )
+            for index in range(5)
+        ]
+
+    def test_first_page(self):
+        """На странице не больше NOTES_COUNT_ON_LIST_PAGE заметок."""
+        response = self.author_client.get(self.LIST_URL)
+        self.assertEqual(
+            list(response.context['object_list']), self.notes[:2]
+        )
+        self.assertEqual(response.context['next_after'], self.notes[1].id)
+
+    def test_next_pages(self):
+        """Следующие страницы выбираются по id последней заметки."""
+        response = self.author_client.get(
+            self.LIST_URL, {'after': self.notes[3].id}
+        )
+        self.assertEqual(list(response.context['object_list']), [
+            self.notes[4]
+        ])
+        self.assertIsNone(response.context['next_after'])
+
+    def test_no_next_page_when_list_ends_exactly(self):
+        """Ссылки на пустую страницу нет."""
+        response = self.author_client.get(
+            self.LIST_URL, {'after': self.notes[2].id}
+        )
+        self.assertIsNone(response.context['next_after'])
+
+    def test_text_not_loaded(self):
+        """Текст заметок на странице списка не загружается."""
+        response = self.author_client.get(self.LIST_URL)
+        for note in response.context['object_list']:
+            self.assertIn('text', note.get_deferred_fields())
+
+    def test_invalid_after(self):
+        """Некорректный параметр after — это 404."""
+        for after in ('abc', 2 ** 63, -2 ** 63 - 1):
+            with self.subTest(after=after):
+                response = self.author_client.get(
+                    self.LIST_URL, {'after': after}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_page_read_in_one_query(self):
+        """Страница и признак следующей страницы читаются одним запросом."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.author_client.get(self.LIST_URL)
+        self.assertEqual(response.context['next_after'], self.notes[1].id)
+        self.assertEqual(len([
+            query for query in queries if 'notes_note' in query['sql']
+        ]), 1)
+
+
+class TestNoteSearch(TestCase):
+    SEARCH_URL = reverse('notes:search')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.reader = User.objects.create(username='Читатель')
+        cls.in_title = Note.objects.create(
+            title='Рецепт борща', text='Свёкла и капуста', author=cls.author
+        )
+        cls.in_text = Note.objects.create(
+            title='Покупки', text='Купить свёклу для борща',
+            author=cls.author,
+        )
+        cls.foreign = Note.objects.create(
+            title='Борщ', text='Чужой рецепт', author=cls.reader
+        )
+
+    def search(self, query):
+        response = self.author_client.get(self.SEARCH_URL, {'q': query})
+        return list(response.context['object_list'])
+
+    def test_search_ranks_title_first(self):
+        """Совпадение в заголовке важнее совпадения в тексте."""
+        self.assertEqual(self.search('борщ'), [self.in_title, self.in_text])
+
+    def test_search_by_prefix(self):
+        """Слова ищутся по началу."""
+        self.assertEqual(self.search('свёк'), [self.in_title, self.in_text])
+
+    def test_search_only_own_notes(self):
+        """Чужие заметки в результаты поиска не попадают."""
+        self.assertNotIn(self.foreign, self.search('рецепт борщ'))
+
+    def test_search_highlights_matches(self):
+        """Найденные слова в тексте выделяются."""
+        response = self.author_client.get(self.SEARCH_URL, {'q': 'купить'})
+        self.assertContains(response, '<mark>Купить</mark>')
+
+    def test_search_highlights_compressed_text(self):
+        """Фрагмент строится и по сжатому тексту длинной заметки."""
+        note = Note.objects.create(
+            title='Длинная', text='слово ' * 2000 + 'Ёлка ' + 'слово ' * 20,
+            author=self.author,
+        )
+        [found] = self.search('ёлк')
+        self.assertEqual(found, note)
+        self.assertIn('<mark>Ёлка</mark>', found.snippet)
+        self.assertTrue(found.snippet.startswith('…'))
+
+    def test_search_follows_edits(self):
+        """После правки заметка не находится по старому тексту."""
+        self.in_text.text = 'Купить морковь'
+        self.in_text.save()
+        self.assertEqual(self.search('свёк'), [self.in_title])
+        self.assertEqual(self.search('морков'), [self.in_text])
+        self.in_text.delete()
+        self.assertEqual(self.search('морков'), [])
+
+    def test_empty_query(self):
+        """Пустой запрос ничего не находит."""
+        self.assertEqual(self.search(' "*'), [])
+
+
+class TestNotesExport(TestCase):
+    EXPORT_URL = reverse('notes:export')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.notes = [
+            Note.objects.create(
+                title=f'Заметка {index}', text='Текст', author=cls.author
+            )
+            for index in range(3)
+        ]
+        Note.objects.create(
+            title='Чужая', text='Текст',
+            author=User.objects.create(username='Читатель'),
+        )
+
+    def test_export_streams_own_notes(self):
+        """Выгрузка построчно отдаёт все заметки пользователя."""
+        response = self.author_client.get(self.EXPORT_URL)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [
+            {'title': note.title, 'text': note.text, 'slug': note.slug}
+            for note in self.notes
+        ])
+
+
+class TestNotesCache(TestCase):
+    LIST_URL = reverse('notes:list')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заголовок', text='Текст', slug='slug', author=cls.author
+        )
+        cls.detail_url = reverse('notes:detail', args=(cls.note.slug,))
+
+    def notes_queries(self, url):
+        """Запросы к таблице заметок при открытии страницы."""
+        with CaptureQueriesContext(connection) as queries:
+            self.author_client.get(url)
+        return [
+            query['sql'] for query in queries
+            if 'notes_note' in query['sql']
+        ]
+
+    def test_pages_served_from_cache(self):
+        """Повторно список и заметка берутся из кеша, без запросов."""
+        for url in (self.LIST_URL, self.detail_url):
+            with self.subTest(url=url):
+                self.assertTrue(self.notes_queries(url))
+                self.assertEqual(self.notes_queries(url), [])
+        self.assertEqual(cache_stats(), {'hits': 2, 'misses': 2})
+
+    def test_cache_invalidated_on_edit(self):
+        """После правки заметки страницы показывают новые данные."""
+        self.author_client.get(self.LIST_URL)
+        self.author_client.get(self.detail_url)
+        self.author_client.post(
+            reverse('notes:edit', args=(self.note.slug,)),
+            data={'title': 'Новый заголовок', 'text': 'Новый текст',
+                  'slug': self.note.slug},
+        )
+        self.assertContains(
+            self.author_client.get(self.LIST_URL), 'Новый заголовок'
+        )
+        self.assertContains(
+            self.author_client.get(self.detail_url), 'Новый текст'
+        )
+
+    def test_shared_with_other_processes(self):
+        """Версии и счётчики видны процессу со своим экземпляром кеша."""
+        with TemporaryDirectory() as location:
+            shared = {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': location,
+            }
+            with self.settings(CACHES={**settings.CACHES, 'shared': shared}):
+                other_process = FileBasedCache(location, {})
+                self.author_client.get(self.LIST_URL)
+                self.author_client.get(self.LIST_URL)
+                cache_stats()
+                self.assertEqual(other_process.get(HITS_KEY), 1)
+                self.assertEqual(other_process.get(MISSES_KEY), 1)
+                version_key = VERSION_KEY.format(author_id=self.author.pk)
+                version = other_process.get(version_key)
+                bump_notes_version(self.author.pk)
+                self.assertNotEqual(other_process.get(version_key), version)
+
+    def test_cache_invalidated_on_admin_reassign(self):
+        """Переданная в админке заметка пропадает у прежнего автора."""
+        self.author_client.get(self.LIST_URL)
+        reader = User.objects.create(username='Читатель')
+        admin = User.objects.create(
+            username='Админ', is_staff=True, is_superuser=True
+        )
+        admin_client = Client()
+        admin_client.force_login(admin)
+        admin_client.post(
+            reverse('admin:notes_note_change', args=(self.note.pk,)),
+            data={'title': self.note.title, 'text': self.note.text,
+                  'slug': self.note.slug, 'author': reader.pk},
+        )
+        response = self.author_client.get(self.LIST_URL)
+        self.assertEqual(len(response.context['object_list']), 0)
+
+
+class TestNoteMarkdown(TestCase):
+    TEXT = (
+        '**Важно** и [ссылка](https://example.com)\n\n'
+        '<script>alert(1)</script> [плохая](javascript:alert(1))'
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор заметки')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.note = Note.objects.create(
+            title='Заголовок', text=cls.TEXT, slug='slug', author=cls.author
+        )
+        cls.detail_url = reverse('notes:detail', args=(cls.note.slug,))
+
+    def test_text_rendered_as_markdown(self):
+        """Текст заметки показывается как Markdown без чужого HTML."""
+        response = self.author_client.get(self.detail_url)
+        self.assertContains(response, '<strong>Важно</strong>')
+        self.assertContains(
+            response, '<a href="https://example.com">ссылка</a>'
+        )
+        self.assertContains(response, '&lt;script&gt;')
+        self.assertNotContains(response, '<script>alert')
+        self.assertNotContains(response, 'javascript:')
+
+    def test_encoded_schemes_removed(self):
+        """Схемы, закодированные сущностями или пробелами, удаляются."""
+        payloads = (
+            '[a](javascript&#58;alert(1))',
+            '[a](&#106;avascript:alert(1))',
+            '[a](javascript&colon;alert(1))',
+            '[a](JaVa&#x0A;Script&#x3A;alert(1))',
+            '[a](java\tscript:alert(1))',
+            '![a](&#x6A;avascript:alert(1))',
+        )
+        for payload in payloads:
+            with self.subTest(payload=payload):
+                html = render_markdown(payload)
+                self.assertNotIn('href=', html)
+                self.assertNotIn('src=', html)
+        self.assertIn(
+            'href="/notes/?a=1&amp;b=2"',
+            render_markdown('[a](/notes/?a=1&amp;b=2)'),
+        )
+
+    @override_settings(NOTES_MARKDOWN_MAX_LENGTH=10)
+    def test_long_text_not_rendered(self):
+        """Слишком длинный текст показывается без разметки Markdown."""
+        response = self.author_client.get(self.detail_url)
+        self.assertContains(response, '**Важно**')
+        self.assertContains(response, '&lt;script&gt;')
+
+    def test_rendered_html_cached_by_text(self):
+        """Один и тот же текст рендерится один раз."""
+        with patch(
+            'notes.rendering.render_markdown', wraps=render_markdown
+        ) as render:
+            self.author_client.get(self.detail_url)
+            # Кеш заметок сброшен, а HTML по тому же тексту остался.
+            cache.clear()
+            self.author_client.get(self.detail_url)
+        render.assert_called_once_with(self.TEXT)
@@ -1,11 +1,32 @@
+import json
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
+from importlib import import_module
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
 
+from django.apps import apps
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from pytils.translit import slugify
 
-from notes.models import Note
+from notes.fields import CompressedText
+from notes.forms import WARNING
+from notes.models import DeletedNote, Note
+from notes.search import search_notes
+from notes.slugs import (
+    _TRANSLIT_TABLE, next_free_slug, slugify as fast_slugify,
+)
 
 
 User = get_user_model()
@@ -142,3 +163,506 @@ class TestNoteEditDelete(TestCase):
         self.assertEqual(notes.author, notes_edit.author)
         self.assertEqual(notes.title, notes_edit.title)
         self.assertEqual(notes.slug, notes_edit.slug)
+
+
+class TestSlugAllocation(TestCase):
+    TITLE = 'Моя заметка'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.base = slugify(cls.TITLE)
+
+    def create_note(self):
+        return Note.objects.create(
+            title=self.TITLE, text='Текст', author=self.author
+        )
+
+    def test_empty_slug_gets_next_suffix(self):
+        """Одинаковые заголовки получают slug с суффиксами -2, -3…"""
+        slugs = [self.create_note().slug for _ in range(3)]
+        self.assertEqual(
+            slugs, [self.base, f'{self.base}-2', f'{self.base}-3']
+        )
+
+    def test_suffix_after_largest_taken(self):
+        """Новый суффикс идёт за наибольшим занятым."""
+        Note.objects.create(
+            title='Другая', text='Текст', author=self.author,
+            slug=f'{self.base}-9'
+        )
+        self.create_note()
+        self.assertEqual(self.create_note().slug, f'{self.base}-10')
+
+    def test_non_numeric_suffix_ignored(self):
+        """Slug с нечисловым продолжением не сдвигает суффикс."""
+        self.create_note()
+        Note.objects.create(
+            title='Планы', text='Текст', author=self.author,
+            slug=f'{self.base}-2024-plans'
+        )
+        self.assertEqual(self.create_note().slug, f'{self.base}-2')
+
+    def test_allocation_is_single_query(self):
+        """Свободный slug ищется одним запросом."""
+        self.create_note()
+        # Запрос slug, затем в savepoint вставка заметки
+        # и добавление в индекс поиска.
+        with self.assertNumQueries(5):
+            self.create_note()
+
+    def test_form_with_empty_slug_allocates_suffix(self):
+        """Форма без slug не отклоняет совпадающий заголовок."""
+        self.create_note()
+        response = self.auth_client.post(
+            ADD_URL, data={'title': self.TITLE, 'text': 'Текст'}
+        )
+        self.assertRedirects(response, SUCCESS_URL)
+        self.assertTrue(Note.objects.filter(slug=f'{self.base}-2').exists())
+
+    def test_retry_on_taken_slug(self):
+        """Если выбранный slug успели занять, берётся следующий."""
+        self.create_note()
+        stale = f'{self.base}-2'
+        Note.objects.create(
+            title='Другая', text='Текст', author=self.author, slug=stale
+        )
+        with patch(
+            'notes.models.next_free_slug',
+            side_effect=[stale, f'{self.base}-3'],
+        ):
+            note = self.create_note()
+        self.assertEqual(note.slug, f'{self.base}-3')
+
+    def test_long_title_suffixes_fit(self):
+        """Суффиксы длинного slug укладываются в длину поля."""
+        max_length = Note._meta.get_field('slug').max_length
+        title = 'щ' * 40
+        slugs = [
+            Note.objects.create(
+                title=title, text='Текст', author=self.author
+            ).slug
+            for _ in range(12)
+        ]
+        base = slugify(title)[:max_length]
+        self.assertEqual(slugs[0], base)
+        self.assertEqual(slugs[1], f'{base[:max_length - 2]}-2')
+        self.assertEqual(slugs[9], f'{base[:max_length - 3]}-10')
+        self.assertEqual(slugs[11], f'{base[:max_length - 3]}-12')
+        self.assertEqual(len(set(slugs)), len(slugs))
+
+    def test_retry_advances_suffix(self):
+        """Повторная попытка не выбирает снова тот же занятый slug."""
+        self.create_note()
+        taken = Note.objects.create(
+            title='Другая', text='Текст', author=self.author,
+            slug=f'{self.base}-2',
+        )
+        others = Note.objects.exclude(pk=taken.pk)
+        self.assertEqual(
+            next_free_slug(others, self.base, 100, after=taken.slug),
+            f'{self.base}-3',
+        )
+
+    def test_form_reports_slug_race(self):
+        """Slug, занятый после проверки формы, — ошибка формы, а не 500."""
+        note = self.create_note()
+        # Обе проверки формы проходят, как при параллельном запросе.
+        with patch('notes.forms.NoteForm.clean_slug',
+                   return_value=note.slug), \
+                patch('notes.forms.NoteForm.validate_unique'):
+            response = self.auth_client.post(ADD_URL, data={
+                'title': 'Новая', 'text': 'Текст', 'slug': note.slug,
+            })
+        self.assertFormError(response, 'form', 'slug', note.slug + WARNING)
+        self.assertEqual(Note.objects.count(), 1)
+
+    def test_edit_keeps_own_slug(self):
+        """При сохранении без slug заметка не конфликтует сама с собой."""
+        note = self.create_note()
+        note.slug = ''
+        note.save()
+        self.assertEqual(note.slug, self.base)
+
+
+class TestSlugify(TestCase):
+    CORPUS_SIZE = 20000
+    POOL = (
+        'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+        'АБВГДЕЁЖЗИЙКЛМНОПРСТУФХЦЧШЩЪЫЬЭЮЯ'
+        'abcdefghijklmnopqrstuvwxyzABCXYZ0123456789'
+        ' \t\n\xa0\u2003-–—‒−_.,!?:;()[]/\\#№"\'`‘’“”«»…'
+        'äöüßéçİıΣσ日本ǅ😀\u0301'
+    )
+
+    def make_title(self, rnd):
+        parts = [
+            rnd.choice(('&', '&amp;', ' - ', '--'))
+            if rnd.random() < 0.05 else rnd.choice(self.POOL)
+            for _ in range(rnd.randint(0, 60))
+        ]
+        return ''.join(parts)
+
+    def test_same_as_pytils(self):
+        """Результат совпадает с pytils.translit.slugify."""
+        rnd = random.Random(0)
+        titles = [self.make_title(rnd) for _ in range(self.CORPUS_SIZE)]
+        mismatches = [
+            title for title in titles
+            if fast_slugify(title) != slugify(title)
+        ]
+        self.assertEqual(mismatches, [])
+
+    def test_table_does_not_grow(self):
+        """Редкие символы не добавляются в таблицу транслитерации."""
+        size = len(_TRANSLIT_TABLE)
+        fast_slugify('日本語 😀 ǅ ' + chr(0x10FFFD))
+        self.assertEqual(len(_TRANSLIT_TABLE), size)
+
+
+class TestConcurrentSlugAllocation(TransactionTestCase):
+    TITLE = 'Одинаковый заголовок'
+    NOTES_COUNT = 2000
+    WORKERS = 4
+
+    def test_parallel_creation(self):
+        """Параллельное создание одноимённых заметок не падает."""
+        author = User.objects.create(username='Автор')
+
+        def create(_):
+            # Тестовая база SQLite в памяти блокирует таблицу целиком
+            # и не ждёт освобождения блокировки, в отличие от файла.
+            # Такие ошибки повторяем здесь, а гонку за slug обязан
+            # разрешить сам Note.save.
+            try:
+                while True:
+                    try:
+                        return Note.objects.create(
+                            title=self.TITLE, text='Текст', author=author
+                        ).slug
+                    except OperationalError as error:
+                        if 'locked' not in str(error):
+                            raise
+                        time.sleep(0.001)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(self.WORKERS) as executor:
+            slugs = list(executor.map(create, range(self.NOTES_COUNT)))
+        self.assertEqual(len(set(slugs)), self.NOTES_COUNT)
+        self.assertEqual(Note.objects.count(), self.NOTES_COUNT)
+
+
+class TestSearchIndexSync(TestCase):
+    SEARCH_URL = reverse('notes:search')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+
+    def search(self, query):
+        response = self.auth_client.get(self.SEARCH_URL, {'q': query})
+        return [note.slug for note in response.context['object_list']]
+
+    def test_index_follows_changes(self):
+        """Индекс поиска обновляется при создании, правке и удалении."""
+        self.auth_client.post(ADD_URL, data={
+            'title': 'Заметка', 'text': 'Слон', 'slug': SLUG
+        })
+        self.assertEqual(self.search('слон'), [SLUG])
+        self.auth_client.post(reverse('notes:edit', args=(SLUG,)), data={
+            'title': 'Заметка', 'text': 'Жираф', 'slug': SLUG
+        })
+        self.assertEqual(self.search('слон'), [])
+        self.assertEqual(self.search('жираф'), [SLUG])
+        self.auth_client.post(reverse('notes:delete', args=(SLUG,)))
+        self.assertEqual(self.search('жираф'), [])
+
+
+class TestNotesTransfer(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.reader = User.objects.create(username='Читатель')
+
+    def test_export_import_roundtrip(self):
+        """Выгруженные заметки загружаются другому пользователю."""
+        for index in range(5):
+            Note.objects.create(
+                title=f'Заметка {index}', text='Слон', author=self.author
+            )
+        exported = StringIO()
+        call_command('export_notes', self.author.username, stdout=exported)
+        Note.objects.all().delete()
+        exported.seek(0)
+        with patch('sys.stdin', exported):
+            call_command(
+                'import_notes', self.reader.username, '-',
+                batch_size=2, stdout=StringIO(),
+            )
+        self.assertEqual(
+            Note.objects.filter(author=self.reader).count(), 5
+        )
+        response = Client()
+        response.force_login(self.reader)
+        found = response.get(reverse('notes:search'), {'q': 'слон'})
+        self.assertEqual(len(found.context['object_list']), 5)
+
+    def test_import_follows_slug_rules(self):
+        """Занятый slug пропускается, пустой подбирается по заголовку."""
+        Note.objects.create(
+            title='Старая', text='Текст', author=self.reader, slug=SLUG
+        )
+        lines = StringIO(
+            json.dumps({'title': 'Дубль', 'text': 'Т', 'slug': SLUG}) + '\n'
+            + json.dumps({'title': 'Старая', 'text': 'Т'}) + '\n'
+            + json.dumps({'title': 'Новая', 'text': 'Т', 'slug': 'new'})
+            + '\n' + '{"title": ' + '\n'
+        )
+        errors = StringIO()
+        with patch('sys.stdin', lines):
+            call_command(
+                'import_notes', self.author.username, '-',
+                stdout=StringIO(), stderr=errors,
+            )
+        self.assertEqual(
+            sorted(Note.objects.filter(
+                author=self.author
+            ).values_list('slug', flat=True)),
+            ['new', slugify('Старая')],
+        )
+        self.assertIn(SLUG + WARNING, errors.getvalue())
+
+
+class TestNotesBulk(TestCase):
+    BULK_URL = reverse('notes:bulk')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.reader = User.objects.create(username='Читатель')
+        for index in range(3):
+            Note.objects.create(
+                title='Заметка', text='Текст', slug=f'own-{index}',
+                author=cls.author,
+            )
+        Note.objects.create(
+            title='Чужая', text='Текст', slug='foreign', author=cls.reader
+        )
+
+    def test_bulk_delete(self):
+        """Удаляются только свои заметки, по каждому slug есть статус."""
+        response = self.auth_client.post(self.BULK_URL, data={
+            'action': 'delete',
+            'slug': ['own-0', 'own-2', 'foreign', 'missing'],
+        })
+        self.assertEqual(response.json(), {'results': {
+            'own-0': 'deleted',
+            'own-2': 'deleted',
+            'foreign': 'not_found',
+            'missing': 'not_found',
+        }})
+        self.assertQuerysetEqual(
+            Note.objects.order_by('slug').values_list('slug', flat=True),
+            ['foreign', 'own-1'],
+        )
+
+    def test_bulk_delete_batched(self):
+        """Индекс и отметки об удалении обновляются одним запросом."""
+        with CaptureQueriesContext(connection) as queries:
+            self.auth_client.post(self.BULK_URL, data={
+                'action': 'delete', 'slug': ['own-0', 'own-1', 'own-2'],
+            })
+        writes = [
+            re.search(r'(?:DELETE FROM|INSERT INTO) "?(\w+)', query['sql'])
+            for query in queries
+        ]
+        writes = [write.group(1) for write in writes if write]
+        for table in ('notes_note', 'notes_note_fts', 'notes_deletednote'):
+            with self.subTest(table=table):
+                self.assertEqual(writes.count(table), 1)
+        self.assertQuerysetEqual(
+            DeletedNote.objects.order_by('slug').values_list(
+                'slug', flat=True
+            ),
+            ['own-0', 'own-1', 'own-2'],
+        )
+        self.assertEqual(search_notes(self.author, 'заметка', 10), [])
+
+    def test_invalid_request(self):
+        """Неизвестное действие и некорректный slug отклоняются."""
+        for data in (
+            {'action': 'move', 'slug': ['own-0']},
+            {'action': 'delete', 'slug': ['не slug']},
+            {'action': 'delete'},
+        ):
+            with self.subTest(data=data):
+                response = self.auth_client.post(self.BULK_URL, data=data)
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(Note.objects.count(), 4)
+
+    @override_settings(NOTES_BULK_LIMIT=2)
+    def test_bulk_limit(self):
+        """Число заметок в одном запросе ограничено."""
+        response = self.auth_client.post(self.BULK_URL, data={
+            'action': 'delete', 'slug': ['own-0', 'own-1', 'own-2'],
+        })
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_anonymous_user_cant_bulk_delete(self):
+        """Анонимный пользователь перенаправляется на страницу входа."""
+        response = self.client.post(self.BULK_URL, data={
+            'action': 'delete', 'slug': ['own-0'],
+        })
+        self.assertRedirects(response, f'{LOGIN_URL}?next={self.BULK_URL}')
+        self.assertEqual(Note.objects.count(), 4)
+
+
+class TestCompressedText(TestCase):
+    LONG_TEXT = 'Длинный документ, вставленный в заметку. ' * 200
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+
+    def stored_type(self, note):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT typeof(text) FROM notes_note WHERE id = %s',
+                (note.pk,),
+            )
+            return cursor.fetchone()[0]
+
+    def create_note(self, text):
+        return Note.objects.create(
+            title='Заметка', text=text, author=self.author
+        )
+
+    def test_long_text_compressed(self):
+        """Длинный текст хранится сжатым и читается без изменений."""
+        note = self.create_note(self.LONG_TEXT)
+        self.assertEqual(self.stored_type(note), 'blob')
+        self.assertEqual(Note.objects.get().text, self.LONG_TEXT)
+
+    def test_short_text_plain(self):
+        """Короткий текст хранится как есть."""
+        note = self.create_note('Короткий текст')
+        self.assertEqual(self.stored_type(note), 'text')
+        self.assertEqual(Note.objects.get().text, 'Короткий текст')
+
+    def test_decompressed_on_access(self):
+        """Текст распаковывается только при обращении к нему."""
+        self.create_note(self.LONG_TEXT)
+        note = Note.objects.get()
+        self.assertIsInstance(note.__dict__['text'], CompressedText)
+        self.assertEqual(note.text, self.LONG_TEXT)
+        self.assertEqual(note.__dict__['text'], self.LONG_TEXT)
+
+    def test_export_decompresses(self):
+        """Выгрузка отдаёт распакованный текст."""
+        self.create_note(self.LONG_TEXT)
+        exported = StringIO()
+        call_command('export_notes', self.author.username, stdout=exported)
+        self.assertEqual(
+            json.loads(exported.getvalue())['text'], self.LONG_TEXT
+        )
+
+    def test_migration_compresses_existing_rows(self):
+        """Миграция сжимает уже сохранённые тексты и умеет их распаковать."""
+        note = self.create_note('Короткий текст')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE notes_note SET text = %s WHERE id = %s',
+                (self.LONG_TEXT, note.pk),
+            )
+        migration = import_module('notes.migrations.0004_compress_note_text')
+        # Внутри транзакции теста SQLite не даёт открыть schema_editor,
+        # а функциям миграции от него нужно только соединение.
+        schema_editor = SimpleNamespace(connection=connection)
+        migration.compress_texts(apps, schema_editor)
+        self.assertEqual(self.stored_type(note), 'blob')
+        migration.decompress_texts(apps, schema_editor)
+        self.assertEqual(self.stored_type(note), 'text')
+        self.assertEqual(Note.objects.get().text, self.LONG_TEXT)
+
+
+@override_settings(NOTES_SYNC_SAFETY_WINDOW=0)
+class TestNotesChanges(TestCase):
+    CHANGES_URL = reverse('notes:changes')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        cls.auth_client = Client()
+        cls.auth_client.force_login(cls.author)
+        cls.notes = [
+            Note.objects.create(
+                title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+                author=cls.author,
+            )
+            for index in range(3)
+        ]
+        Note.objects.create(
+            title='Чужая', text='Текст', slug='foreign',
+            author=User.objects.create(username='Читатель'),
+        )
+
+    def sync(self, since=None):
+        data = {'since': since} if since else {}
+        return self.auth_client.get(self.CHANGES_URL, data).json()
+
+    def test_full_sync(self):
+        """Без курсора отдаются все заметки пользователя."""
+        result = self.sync()
+        self.assertEqual(
+            [change['slug'] for change in result['changes']],
+            ['note-0', 'note-1', 'note-2'],
+        )
+        self.assertFalse(result['has_more'])
+
+    def test_incremental_sync(self):
+        """По курсору приходят только изменения и удаления."""
+        cursor = self.sync()['cursor']
+        self.assertEqual(self.sync(cursor)['changes'], [])
+        note = self.notes[1]
+        note.text = 'Новый текст'
+        note.save()
+        deleted_id = self.notes[0].id
+        self.notes[0].delete()
+        changes = self.sync(cursor)['changes']
+        self.assertEqual(
+            [(change['id'], change['deleted']) for change in changes],
+            [(note.id, False), (deleted_id, True)],
+        )
+        self.assertEqual(changes[0]['text'], 'Новый текст')
+
+    @override_settings(NOTES_SYNC_LIMIT=2)
+    def test_sync_pages(self):
+        """Изменения отдаются страницами, пока has_more истинно."""
+        first = self.sync()
+        self.assertTrue(first['has_more'])
+        second = self.sync(first['cursor'])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(
+            [change['slug'] for change in
+             first['changes'] + second['changes']],
+            ['note-0', 'note-1', 'note-2'],
+        )
+
+    @override_settings(NOTES_SYNC_SAFETY_WINDOW=60)
+    def test_recent_changes_resent(self):
+        """Изменения из окна безопасности приходят повторно."""
+        cursor = self.sync()['cursor']
+        self.assertEqual(len(self.sync(cursor)['changes']), 3)
+
+    def test_invalid_cursor(self):
+        """Некорректный курсор — это ошибка 400."""
+        response = self.auth_client.get(self.CHANGES_URL, {'since': 'abc'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -1,15 +1,20 @@
+import json
 from http import HTTPStatus
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase, Client
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from notes.models import Note
+from yanote.auth import invalidate_user
 
 
 SLUG = 'note-slug'
 HOME_URL = reverse('notes:home')
 LIST_URL = reverse('notes:list')
+SEARCH_URL = reverse('notes:search')
 ADD_URL = reverse('notes:add')
 SUCCESS_URL = reverse('notes:success')
 LOGIN_URL = reverse('users:login')
@@ -39,7 +44,7 @@ class TestRoutes(TestCase):
             slug=SLUG
         )
         cls.all_urls = (SINGUP_URL, LOGIN_URL, SUCCESS_URL, HOME_URL,
-                        DETAIL_URL, LIST_URL, ADD_URL,
+                        DETAIL_URL, LIST_URL, SEARCH_URL, ADD_URL,
                         EDIT_URL, DELETE_URL, LOGOUT_URL)
 
     def test_pages_availability_new(self):
@@ -69,12 +74,53 @@ class TestRoutes(TestCase):
         for url in self.all_urls:
             with self.subTest(url=url):
                 response = self.client.get(url)
-                inaccessible_pages_anon_users = (LIST_URL, ADD_URL,
-                                                 SUCCESS_URL, DETAIL_URL,
-                                                 EDIT_URL, DELETE_URL)
+                inaccessible_pages_anon_users = (LIST_URL, SEARCH_URL,
+                                                 ADD_URL, SUCCESS_URL,
+                                                 DETAIL_URL, EDIT_URL,
+                                                 DELETE_URL)
                 if url in inaccessible_pages_anon_users:
                     redirect_url = f'{LOGIN_URL}?next={url}'
                     self.assertRedirects(response, redirect_url)
                 else:
                     self.assertEqual(response.status_code,
                                      HTTPStatus.OK)
+
+    @override_settings(SLOW_QUERY_LOG=True, SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_query_log(self):
+        """Медленные запросы пишутся в лог с именем маршрута."""
+        with self.assertLogs('yanote.sql', level='INFO') as logs:
+            Client().get(HOME_URL)
+            self.author_client.get(LIST_URL)
+        summary = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(summary['view'], 'notes:list')
+        self.assertGreater(summary['queries'], 0)
+
+    def test_session_and_user_from_cache(self):
+        """Сессия и пользователь не читаются из базы на каждом запросе."""
+        self.author_client.get(LIST_URL)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.author_client.get(LIST_URL)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        tables = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('django_session', tables)
+        self.assertNotIn('auth_user', tables)
+
+    def test_password_change_ends_cached_session(self):
+        """После смены пароля закешированная сессия больше не действует."""
+        client = Client()
+        client.force_login(self.reader)
+        client.get(LIST_URL)
+        self.reader.set_password('new-password')
+        self.reader.save()
+        response = client.get(LIST_URL)
+        self.assertRedirects(response, f'{LOGIN_URL}?next={LIST_URL}')
+
+    def test_deactivation_by_update_after_invalidate(self):
+        """Блокировка через update() действует после invalidate_user."""
+        client = Client()
+        client.force_login(self.reader)
+        client.get(LIST_URL)
+        User.objects.filter(pk=self.reader.pk).update(is_active=False)
+        invalidate_user(self.reader.pk)
+        response = client.get(LIST_URL)
+        self.assertRedirects(response, f'{LOGIN_URL}?next={LIST_URL}')
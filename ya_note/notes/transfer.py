@@ -0,0 +1,24 @@
+import json
+
+from .models import Note
+
+EXPORT_FIELDS = ('title', 'text', 'slug')
+# Сколько строк за раз читается из базы при выгрузке.
+EXPORT_CHUNK_SIZE = 2000
+
+
+def export_notes(author):
+    """
+    Заметки автора построчно в формате JSON Lines.
+
+    Заметки читаются из базы порциями, поэтому расход памяти
+    не зависит от их числа.
+    """
+    notes = Note.objects.filter(author=author).order_by('id').values_list(
+        *EXPORT_FIELDS
+    )
+    for values in notes.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        # str() распаковывает сжатый текст заметки.
+        yield json.dumps(
+            dict(zip(EXPORT_FIELDS, map(str, values))), ensure_ascii=False
+        ) + '\n'
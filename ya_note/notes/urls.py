@@ -11,5 +11,9 @@ urlpatterns = [
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('notes/bulk/', views.NotesBulk.as_view(), name='bulk'),
+    path('notes/changes/', views.NotesChanges.as_view(), name='changes'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('export/', views.NotesExport.as_view(), name='export'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
 ]
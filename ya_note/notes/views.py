@@ -1,9 +1,22 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
-from .models import Note
+from .cache import get_or_set, list_key, note_key
+from .forms import WARNING, NoteForm, NotesBulkForm
+from .models import DeletedNote, Note
+from .rendering import render_note_text
+from .search import search_notes, unindex_notes
+from .signals import deleting_in_bulk, invalidate_notes_cache
+from .sync import InvalidCursor, get_changes
+from .transfer import export_notes
+
+# Значения вне диапазона целых чисел SQLite база не принимает.
+MIN_ID = -2 ** 63
+MAX_ID = 2 ** 63 - 1
 
 
 class Home(generic.TemplateView):
@@ -26,19 +39,35 @@ class NoteBase(LoginRequiredMixin):
         return self.model.objects.filter(author=self.request.user)
 
 
-class NoteCreate(NoteBase, generic.CreateView):
+class NoteFormMixin:
+    """
+    Сохранение заметки из формы.
+
+    Проверка slug в форме не защищает от параллельного запроса,
+    занявшего тот же slug: тогда ошибку уникальности вернёт база,
+    и она показывается в форме, как и ошибка проверки.
+    """
+
+    def form_valid(self, form):
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError:
+            form.add_error('slug', form.instance.slug + WARNING)
+            return self.form_invalid(form)
+
+
+class NoteCreate(NoteBase, NoteFormMixin, generic.CreateView):
     """Добавление заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteBase, NoteFormMixin, generic.UpdateView):
     """Редактирование заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
@@ -50,10 +79,157 @@ class NoteDelete(NoteBase, generic.DeleteView):
 
 
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список заметок пользователя постранично.
+
+    Страницы выбираются по id (?after=<id последней заметки>), а не
+    через OFFSET, поэтому любая страница читается из индекса
+    (author, id) одинаково быстро. Текст заметки не загружается,
+    а страница кешируется до изменения заметок пользователя.
+    """
     template_name = 'notes/list.html'
 
+    def get_after(self):
+        after = self.request.GET.get('after')
+        if after is None:
+            return None
+        try:
+            after = int(after)
+        except ValueError:
+            raise Http404('Некорректный номер страницы.')
+        if not MIN_ID <= after <= MAX_ID:
+            raise Http404('Некорректный номер страницы.')
+        return after
+
+    def get_queryset(self):
+        queryset = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        after = self.get_after()
+        if after is not None:
+            queryset = queryset.filter(id__gt=after)
+        return queryset
+
+    def get_page(self):
+        """Лишняя заметка в выборке показывает, что есть следующая страница."""
+        per_page = settings.NOTES_COUNT_ON_LIST_PAGE
+        page = list(self.object_list[:per_page + 1])
+        if len(page) > per_page:
+            return page[:per_page], page[per_page - 1].id
+        return page, None
+
+    def get_context_data(self, **kwargs):
+        page, next_after = get_or_set(
+            list_key(self.request.user.pk, self.get_after()), self.get_page
+        )
+        return super().get_context_data(
+            object_list=page, next_after=next_after, **kwargs
+        )
+
+
+class NotesBulk(NoteBase, generic.View):
+    """
+    Удаление нескольких заметок одним запросом.
+
+    Заметки выбираются одним запросом с проверкой автора и удаляются
+    в одной транзакции. В ответе для каждого slug указано, удалена ли
+    заметка; чужие заметки считаются не найденными.
+
+    Обработчики сигналов удаления на время запроса отключены
+    (deleting_in_bulk): индекс поиска, отметки об удалении и версия
+    кеша обновляются по одному разу на весь запрос, а не на каждую
+    заметку.
+    """
+
+    def post(self, request):
+        form = NotesBulkForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({'errors': form.errors}, status=400)
+        slugs = form.cleaned_data['slug']
+        with transaction.atomic():
+            found = dict(
+                self.get_queryset().filter(slug__in=slugs)
+                .values_list('slug', 'id')
+            )
+            if found:
+                self.delete_notes(found)
+        return JsonResponse({'results': {
+            slug: 'deleted' if slug in found else 'not_found'
+            for slug in slugs
+        }})
+
+    def delete_notes(self, ids_by_slug):
+        notes = Note.objects.filter(id__in=ids_by_slug.values())
+        unindex_notes(ids_by_slug.values())
+        with deleting_in_bulk():
+            # Сигналам нужны объекты заметок, но не их тексты.
+            notes.only('id').delete()
+        DeletedNote.objects.bulk_create(
+            DeletedNote(note_id=note_id, slug=slug, author=self.request.user)
+            for slug, note_id in ids_by_slug.items()
+        )
+        invalidate_notes_cache(self.request.user.pk)
+
+
+class NotesChanges(LoginRequiredMixin, generic.View):
+    """
+    Изменения заметок пользователя для синхронизации клиентов.
+
+    Без параметра since отдаются все заметки; в ответе есть курсор
+    для следующего запроса.
+    """
+
+    def get(self, request):
+        try:
+            changes = get_changes(request.user, request.GET.get('since'))
+        except InvalidCursor as error:
+            return JsonResponse({'errors': str(error)}, status=400)
+        return JsonResponse(changes)
+
+
+class NoteSearch(LoginRequiredMixin, generic.ListView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_queryset(self):
+        return search_notes(
+            self.request.user,
+            self.request.GET.get('q', ''),
+            settings.NOTES_SEARCH_RESULTS,
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+class NotesExport(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя в формате JSON Lines."""
+
+    def get(self, request):
+        response = StreamingHttpResponse(
+            export_notes(request.user),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="notes.jsonl"'
+        )
+        return response
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+    def get_object(self, queryset=None):
+        """Заметка кешируется до изменения заметок пользователя."""
+        return get_or_set(
+            note_key(self.request.user.pk, self.kwargs[self.slug_url_kwarg]),
+            lambda: super(NoteDetail, self).get_object(queryset),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['text_html'] = render_note_text(self.object.text)
+        return context
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+import mimetypes
+import time
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.backends.sqlite3.base import SQLiteCursorWrapper
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+
+logger = logging.getLogger('yanote.sql')
+
+_recorder = ContextVar('slow_query_recorder', default=None)
+
+
+class QueryRecorder:
+    """Считает запросы одного HTTP-запроса и запоминает медленные."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.count = 0
+        self.duration = 0
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            if duration >= self.threshold:
+                self.slow.append({
+                    'sql': sql,
+                    'duration_ms': round(duration * 1000, 3),
+                    'plan': self.explain(context['connection'], sql, params,
+                                         many),
+                })
+
+    @staticmethod
+    def explain(connection, sql, params, many):
+        """
+        План запроса SQLite.
+
+        Выполняется в обход обёрток Django, чтобы сам EXPLAIN
+        не попал в статистику.
+        """
+        if many or connection.vendor != 'sqlite':
+            return None
+        if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            return None
+        cursor = connection.connection.cursor(factory=SQLiteCursorWrapper)
+        try:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+        except connection.Database.Error:
+            return None
+        finally:
+            cursor.close()
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_recorder(connection, **kwargs):
+    """
+    Подключает запись запросов к соединению.
+
+    Обёртка ставится на каждое соединение, а запросы относятся к
+    HTTP-запросу через ContextVar: так учитываются и запросы,
+    выполненные в других потоках того же контекста.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class SlowQueryLogMiddleware:
+    """
+    Журнал медленных SQL-запросов.
+
+    Включается настройкой SLOW_QUERY_LOG. Каждый запрос дольше
+    SLOW_QUERY_THRESHOLD_MS миллисекунд пишется в лог вместе с
+    планом выполнения и именем маршрута, а по каждому HTTP-запросу
+    пишется общее число SQL-запросов. Записи — JSON-строки,
+    чтобы их можно было агрегировать между инстансами.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        connection_created.connect(install_recorder)
+
+    def __call__(self, request):
+        for connection in connections.all():
+            install_recorder(connection)
+        recorder = QueryRecorder(self.threshold)
+        token = _recorder.set(recorder)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        self.log(request, response, recorder, time.perf_counter() - start)
+        return response
+
+    def log(self, request, response, recorder, duration):
+        match = request.resolver_match
+        view = match.view_name if match else None
+        for query in recorder.slow:
+            logger.warning(json.dumps(
+                {'event': 'slow_query', 'view': view, **query},
+                ensure_ascii=False,
+            ))
+        logger.info(json.dumps({
+            'event': 'request',
+            'view': view,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'queries_ms': round(recorder.duration * 1000, 3),
+            'duration_ms': round(duration * 1000, 3),
+        }, ensure_ascii=False))
+
+
+class StaticFilesMiddleware:
+    """
+    Отдаёт собранную collectstatic статику без обращения к Django.
+
+    Список файлов составляется при запуске, поэтому запрос может
+    получить только файл из STATIC_ROOT. Файлы с хешем содержимого в
+    имени отдаются с кешированием на год, клиентам с поддержкой gzip
+    отдаётся заранее сжатая копия.
+    """
+
+    max_age = 365 * 24 * 60 * 60
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        from django.contrib.staticfiles.storage import staticfiles_storage
+
+        if not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        root = Path(settings.STATIC_ROOT)
+        self.files = {
+            path.relative_to(root).as_posix(): path
+            for path in root.rglob('*')
+            if path.is_file() and path.suffix != '.gz'
+        }
+        self.immutable = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values()
+        )
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        response = self.serve(request)
+        if response is not None:
+            return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        response = self.serve(request)
+        if response is not None:
+            return response
+        return await self.get_response(request)
+
+    def serve(self, request):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        if not request.path.startswith(self.prefix):
+            return None
+        name = request.path[len(self.prefix):]
+        path = self.files.get(name)
+        if path is None:
+            return None
+        content_type = mimetypes.guess_type(name)[0]
+        gzipped = path.with_name(path.name + '.gz')
+        accepts_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        if accepts_gzip and gzipped.exists():
+            response = FileResponse(
+                gzipped.open('rb'), content_type=content_type
+            )
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = FileResponse(path.open('rb'), content_type=content_type)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if name in self.immutable:
+            response['Cache-Control'] = (
+                f'public, max-age={self.max_age}, immutable'
+            )
+        else:
+            response['Cache-Control'] = 'public, max-age=60'
+        return response
@@ -22,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanote.middleware.SlowQueryLogMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,10 +53,26 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+# Параметры соединений SQLite, см. yanote.db.base.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение — размер в килобайтах.
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'yanote.db',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
@@ -70,6 +87,74 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'sql': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'yanote.sql': {
+            'handlers': ['sql'],
+            'level': 'INFO',
+        },
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # При переполнении вытесняются давно не читавшиеся записи.
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    # HTML заметок из Markdown, см. notes.rendering.
+    'markdown': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'markdown',
+        'OPTIONS': {'MAX_ENTRIES': 1000},
+    },
+    # Версии заметок и счётчики кеша, общие для всех процессов сервера
+    # и команд manage.py, см. notes.cache.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'shared',
+        'OPTIONS': {'MAX_ENTRIES': 100000},
+    },
+    # Сессии и пользователи сессий, см. yanote.auth. Кеш файловый,
+    # чтобы выход и смена пароля были видны всем процессам сервера.
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'sessions',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+SESSION_CACHE_ALIAS = 'sessions'
+
+AUTHENTICATION_BACKENDS = ['yanote.auth.CachedModelBackend']
+# Столько же может действовать блокировка пользователя через
+# QuerySet.update(), минуя сигналы, см. CachedModelBackend.
+AUTH_USER_CACHE_TIMEOUT = 60
+
+NOTES_CACHE_TIMEOUT = 60 * 60
+NOTES_COUNT_ON_LIST_PAGE = 100
+NOTES_BULK_LIMIT = 1000
+NOTES_SYNC_LIMIT = 500
+NOTES_SYNC_SAFETY_WINDOW = 5
+NOTES_MARKDOWN_MAX_LENGTH = 100_000
+NOTES_SEARCH_RESULTS = 20
+
+SLOW_QUERY_LOG = False
+SLOW_QUERY_THRESHOLD_MS = 100
+
+
 LANGUAGE_CODE = 'ru'
 
 TIME_ZONE = 'Europe/Moscow'
@@ -82,6 +167,11 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+STATICFILES_DIRS = [BASE_DIR / 'static']
+
+# Подключать Bootstrap из своей статики, а не из CDN,
+# см. notes.templatetags.assets.
+BOOTSTRAP_VENDORED = False
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 